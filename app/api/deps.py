@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
@@ -7,10 +7,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import data_center_engine, engine
+from app.core.db import async_engine, data_center_engine, engine
+from app.cruds import user_crud
 from app.models.basic_model import TokenPayload
 from app.models.user_model import User
 
@@ -27,12 +29,18 @@ def get_data_center_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 SessionDep = Annotated[Session, Depends(get_db)]
 DCSessionDep = Annotated[Session, Depends(get_data_center_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> type[User]:
+async def get_current_user(session: AsyncSessionDep, token: TokenDep) -> User:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
         token_data = TokenPayload(**payload)
@@ -41,9 +49,14 @@ def get_current_user(session: SessionDep, token: TokenDep) -> type[User]:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    user = user_crud.get_cached_user(token_data.sub)
+    if user is None:
+        user = await session.get(User, token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        # 与异步会话解绑，同步路由可以直接 session.add(current_user)
+        session.expunge(user)
+        user_crud.cache_user(user)
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
@@ -1,30 +1,52 @@
 import json
+import uuid
 from json import JSONDecodeError
-from typing import Any
-
-import httpx
-from fastapi import APIRouter, HTTPException
-from sqlalchemy import MetaData, Table, inspect, text
-from sqlmodel import col, func, select
-
-from app.api.deps import CurrentUser, DCSessionDep, SessionDep
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Engine, literal, text, tuple_
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import AsyncSessionDep, CurrentUser, SessionDep, get_current_active_superuser
+from app.core.config import settings
+from app.core.db import get_async_data_center_engine, get_data_center_engine
 from app.models.basic_model import Message
 from app.models.data_model import (
     DataQuery,
     DataQueryConfig,
     DatasQueryConfigPublic,
     DatasQueryPublic,
+    GhostBulkSend,
+    GhostJob,
+    GhostJobPublic,
     QueryDataPublicDetail,
     QueryDatasPublic,
 )
+from app.services import data_export, ghost_outbox, saved_query, schema_cache, table_counts
+from app.utils import CursorUtil
 
 router = APIRouter(prefix="/datas", tags=["datas"])
 
 
+def query_config(session: Session, config_id: uuid.UUID) -> DataQueryConfig:
+    data_query_config = session.get(DataQueryConfig, config_id)
+    if not data_query_config:
+        raise HTTPException(status_code=404, detail="数据查询配置不存在")
+    return data_query_config
+
+
+def config_engine(session: Session, config_id: uuid.UUID) -> Engine:
+    """返回数据查询配置所指向的数据中心 engine。"""
+    return get_data_center_engine(query_config(session, config_id).db_uri)
+
+
 @router.get("/configs", response_model=DatasQueryConfigPublic)
-def read_configs(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_configs(session: AsyncSessionDep, skip: int = 0, limit: int = 100) -> Any:
     count_statement = select(func.count()).select_from(DataQueryConfig).where(DataQueryConfig.enabled)
-    count = session.exec(count_statement).one()
+    count = (await session.exec(count_statement)).one()
 
     statement = (
         select(DataQueryConfig)
@@ -33,7 +55,7 @@ def read_configs(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
         .offset(skip)
         .limit(limit)
     )
-    data_query = session.exec(statement).all()
+    data_query = (await session.exec(statement)).all()
 
     return DatasQueryConfigPublic(data=data_query, count=count)
 
@@ -41,37 +63,42 @@ def read_configs(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
 @router.get("/table/{config_id}", response_model=QueryDatasPublic)
 def query_datas(
     session: SessionDep,
-    dc_session: DCSessionDep,
     config_id: str,
     current_user: CurrentUser,
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
+    exact_count: bool = False,
 ) -> Any:
+    """
+    Browse a data-center table, newest first.
+
+    Pass the returned ``next_cursor`` back as ``cursor`` to page with a keyset
+    instead of ``skip``; deep pages then cost the same as the first one.
+
+    ``count`` is a cached or catalog-estimated row count unless ``exact_count``
+    is set; ``count_type`` tells which one was used.
+    """
     statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
     data_query = session.exec(statement).one()
     table_name = data_query.table_name
 
-    # 1. 安全检查：验证表是否存在
-    # 使用 inspect 检查数据库中实际存在的表名，防止 SQL 注入和 404
-    engine = dc_session.connection().engine
-    inspector = inspect(engine)
-    if table_name not in inspector.get_table_names():
-        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
-
-    # 2. 动态加载表结构 (Reflection)
-    metadata = MetaData()
+    # 1. 动态加载表结构 (Reflection)
+    # 表结构按 (连接, 表名) 缓存，配置的 updated_at 变化时自动重新反射
+    engine = get_data_center_engine(data_query.db_uri)
     try:
-        # autoload_with 会自动从数据库读取字段信息
-        table = Table(table_name, metadata, autoload_with=engine)
+        table = schema_cache.get_table(engine, table_name, version=data_query.updated_at)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error loading table: {str(e)}")
+    # 2. 安全检查：表不存在时返回 404，防止 SQL 注入
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
 
     # 3. 构建查询 (更优雅的 Pythonic 方式)
 
     # 3.1 计算总数
-    # 相当于: SELECT count(*) FROM table_name
-    count_query = select(func.count()).select_from(table)
-    count = dc_session.exec(count_query).one()
+    # 默认使用缓存的精确值或数据库目录估算值，避免每次翻页都全表 COUNT(*)
+    count, count_type = table_counts.count_rows(engine, table, exact=exact_count)
 
     # 3.2 查询数据
     # 你指定了 id, url, title, publish_time，我们需要检查表里是否有这些字段
@@ -93,28 +120,98 @@ def query_datas(
 
     # 添加排序、分页
     # 注意：如果 publish_time 不存在，这里会报错，需要防御性编程
-    if "publish_time" in table.c:
+    # 同时存在 publish_time 与 id 时按 (publish_time, id) 排序，支持游标分页
+    keyset = "publish_time" in table.c and "id" in table.c
+    if keyset:
+        query = query.order_by(table.c.publish_time.desc(), table.c.id.desc())
+    elif "publish_time" in table.c:
         query = query.order_by(table.c.publish_time.desc())
 
-    query = query.offset(skip).limit(limit)
+    if cursor:
+        if not keyset:
+            raise HTTPException(status_code=400, detail=f"Table '{table_name}' does not support cursor paging")
+        try:
+            last_publish_time, last_id = CursorUtil.decode(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(
+            tuple_(table.c.publish_time, table.c.id)
+            < tuple_(literal(last_publish_time, table.c.publish_time.type), literal(last_id, table.c.id.type))
+        )
+    else:
+        query = query.offset(skip)
+
+    query = query.limit(limit)
 
     # 4. 执行查询
-    result = dc_session.exec(query)
+    with Session(engine) as dc_session:
+        result = dc_session.exec(query)
+
+        # 5. 格式化结果
+        # session.exec 返回的是 Row 对象，类似于 NamedTuple
+        # 如果查询的是部分字段，mappings().all() 能更好转为字典
+        rows = result.mappings().all()
+
+    # 6. 生成下一页游标：本页已满才可能存在下一页
+    next_cursor = None
+    if keyset and rows and len(rows) == limit and rows[-1]["publish_time"] is not None:
+        next_cursor = CursorUtil.encode(rows[-1]["publish_time"], rows[-1]["id"])
+
+    return QueryDatasPublic(data=rows, count=count, count_type=count_type.value, next_cursor=next_cursor)
+
+
+@router.post("/table/{config_id}/refresh", dependencies=[Depends(get_current_active_superuser)])
+def refresh_table_schema(session: SessionDep, config_id: str) -> Message:
+    """
+    Drop the cached table schema of a config so the next query reflects it again.
+    """
+    statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
+    data_query = session.exec(statement).one()
+
+    schema_cache.invalidate_table(data_query.table_name, engine=get_data_center_engine(data_query.db_uri))
+    return Message(message=f"表结构缓存已刷新：{data_query.table_name}")
+
+
+@router.get("/table/{config_id}/export")
+def export_datas(
+    session: SessionDep,
+    config_id: str,
+    _current_user: CurrentUser,
+    export_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    """
+    Stream a whole data-center table as NDJSON or CSV.
+    """
+    statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
+    data_query = session.exec(statement).one()
+    table_name = data_query.table_name
 
-    # 5. 格式化结果
-    # session.exec 返回的是 Row 对象，类似于 NamedTuple
-    # 如果查询的是部分字段，mappings().all() 能更好转为字典
-    rows = result.mappings().all()
+    engine = get_data_center_engine(data_query.db_uri)
+    try:
+        table = schema_cache.get_table(engine, table_name, version=data_query.updated_at)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error loading table: {str(e)}")
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Table '{table_name}' not found")
+
+    query = select(table)
+    if "publish_time" in table.c:
+        query = query.order_by(table.c.publish_time.desc())
 
-    return QueryDatasPublic(data=rows, count=count)
+    rows = data_export.stream_rows(engine, query)
+    return StreamingResponse(
+        data_export.iter_export(rows, export_format),
+        media_type=data_export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": data_export.content_disposition(f"{table_name}.{export_format}")},
+    )
 
 
 @router.get("/sqls/{config_id}", response_model=DatasQueryPublic)
-def query_datas_sqls(
-    session: SessionDep, current_user: CurrentUser, config_id: str, skip: int = 0, limit: int = 100
+async def query_datas_sqls(
+    session: AsyncSessionDep, current_user: CurrentUser, config_id: str, skip: int = 0, limit: int = 100
 ) -> Any:
     count_statement = select(func.count()).select_from(DataQuery).where(DataQuery.config_id == config_id)
-    count = session.exec(count_statement).one()
+    count = (await session.exec(count_statement)).one()
 
     statement = (
         select(DataQuery)
@@ -123,7 +220,7 @@ def query_datas_sqls(
         .offset(skip)
         .limit(limit)
     )
-    data_query = session.exec(statement).all()
+    data_query = (await session.exec(statement)).all()
 
     return DatasQueryPublic(data=data_query, count=count)
 
@@ -131,34 +228,109 @@ def query_datas_sqls(
 @router.get("/sql/{sql_id}", response_model=QueryDatasPublic)
 def query_datas_by_sql_id(
     session: SessionDep,
-    dc_session: DCSessionDep,
+    response: Response,
     sql_id: str,
     current_user: CurrentUser,
+    skip: int = 0,
+    limit: int = 100,
+    refresh: bool = False,
 ) -> Any:
+    """
+    Run a saved SQL query, one page at a time.
+
+    The query is wrapped in an outer LIMIT/OFFSET, cancelled by the database
+    after DATA_QUERY_TIMEOUT seconds and can only be paged through its first
+    DATA_QUERY_MAX_ROWS rows; ``count`` is capped accordingly.
+
+    Pages are cached per SQL text, target database and ``updated_at`` for the
+    query's ``cache_ttl`` (default DATA_QUERY_CACHE_TTL) seconds; ``refresh`` bypasses the cache. ``X-Cache``
+    tells whether the page was a cache HIT or MISS and ``Age`` how old it is.
+    """
     statement = select(DataQuery).where(DataQuery.id == sql_id)
     data_query = session.exec(statement).one()
 
-    sql_statement = text(data_query.sql)
-    result = dc_session.execute(sql_statement)
-    results = result.mappings().all()
-    return QueryDatasPublic(data=results, count=len(results))
+    max_rows = settings.DATA_QUERY_MAX_ROWS
+    skip = max(skip, 0)
+    limit = max(min(limit, max_rows - skip), 0)
+    db_uri = query_config(session, data_query.config_id).db_uri
 
+    cached = None
+    if saved_query.cache_ttl(data_query) > 0 and not refresh:
+        cached = saved_query.get_cached_page(data_query, db_uri, skip, limit)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        response.headers["Age"] = str(cached.age)
+        return QueryDatasPublic(data=cached.rows, count=cached.count)
 
-@router.get("/{config_id}/detail/{detail_id}", response_model=QueryDataPublicDetail)
-def query_data_detail(
+    engine = get_data_center_engine(db_uri)
+    try:
+        with engine.connect() as connection, saved_query.statement_timeout(connection, settings.DATA_QUERY_TIMEOUT):
+            count = connection.execute(saved_query.capped_count(data_query.sql), {"cap": max_rows}).scalar_one()
+            result = connection.execute(saved_query.paginate(data_query.sql), {"skip": skip, "limit": limit})
+            results = [dict(row) for row in result.mappings()]
+    except OperationalError as e:
+        raise HTTPException(status_code=504, detail=f"SQL 查询超时或被取消: {e.orig}")
+    except DBAPIError as e:
+        raise HTTPException(status_code=400, detail=f"SQL 查询执行失败: {e.orig}")
+
+    saved_query.cache_page(data_query, db_uri, skip, limit, results, count)
+    response.headers["X-Cache"] = "MISS"
+    response.headers["Age"] = "0"
+    return QueryDatasPublic(data=results, count=count)
+
+
+@router.delete("/sql/{sql_id}/cache", dependencies=[Depends(get_current_active_superuser)])
+def clear_sql_cache(session: SessionDep, sql_id: str) -> Message:
+    """
+    Drop cached result pages of a saved SQL query.
+    """
+    statement = select(DataQuery).where(DataQuery.id == sql_id)
+    data_query = session.exec(statement).one()
+
+    cleared = saved_query.invalidate_results(data_query.id)
+    return Message(message=f"已清除 {data_query.name} 的 {cleared} 条查询结果缓存")
+
+
+@router.get("/sql/{sql_id}/export")
+def export_datas_by_sql_id(
     session: SessionDep,
-    dc_session: DCSessionDep,
+    sql_id: str,
+    _current_user: CurrentUser,
+    export_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+) -> StreamingResponse:
+    """
+    Stream the full result of a saved SQL query as NDJSON or CSV.
+    """
+    statement = select(DataQuery).where(DataQuery.id == sql_id)
+    data_query = session.exec(statement).one()
+
+    rows = data_export.stream_rows(
+        config_engine(session, data_query.config_id),
+        text(saved_query.normalize_sql(data_query.sql)),
+        timeout=settings.DATA_EXPORT_TIMEOUT,
+    )
+    return StreamingResponse(
+        data_export.iter_export(rows, export_format),
+        media_type=data_export.MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": data_export.content_disposition(f"{data_query.name}.{export_format}")},
+    )
+
+
+@router.get("/{config_id}/detail/{detail_id}", response_model=QueryDataPublicDetail)
+async def query_data_detail(
+    session: AsyncSessionDep,
     config_id: str,
     detail_id: int,
     current_user: CurrentUser,
 ) -> Any:
     statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
-    data_query = session.exec(statement).one()
+    data_query = (await session.exec(statement)).one()
     table_name = data_query.table_name
 
     sql_statement = text(f"SELECT * FROM {table_name} WHERE id = {detail_id};")
-    result_statement = dc_session.execute(sql_statement)
-    result = result_statement.mappings().one()
+    async with AsyncSession(get_async_data_center_engine(data_query.db_uri)) as dc_session:
+        result_statement = await dc_session.execute(sql_statement)
+        result = result_statement.mappings().one()
     result_dict = dict(result)
     try:
         content_json = json.loads(result_dict["content"])
@@ -169,55 +341,64 @@ def query_data_detail(
     return QueryDataPublicDetail(**result_dict)
 
 
-@router.get("/{config_id}/detail/{detail_id}/send_ghost_test")
+async def ghost_table_name(session: AsyncSession, config_id: str) -> str:
+    statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
+    data_query = (await session.exec(statement)).first()
+    if not data_query:
+        raise HTTPException(status_code=404, detail="数据查询配置不存在")
+    return data_query.table_name
+
+
+@router.get("/{config_id}/detail/{detail_id}/send_ghost_test", response_model=GhostJobPublic, status_code=202)
 async def query_data_detail_send_ghost_test(
-    session: SessionDep,
+    session: AsyncSessionDep,
     config_id: str,
     detail_id: int,
     current_user: CurrentUser,
-) -> Message:
-    statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
-    data_query = session.exec(statement).one()
-    table_name = data_query.table_name
-
-    url = "http://127.0.0.1:22333/crawler/ghost_api"
-    # url = "http://192.168.14.60:22333/crawler/ghost_api"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                url, json={"table_name": table_name, "record_id": detail_id, "is_alpha": False}, timeout=300
-            )
-
-            if response.status_code == 200:
-                return Message(message=f"Ghost 发送成功：{table_name} - {detail_id}")
-            else:
-                raise HTTPException(status_code=502, detail=f"Ghost 服务返回错误: {response.text}")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail="无法连接到 Ghost 服务")
+) -> Any:
+    """
+    Queue a record for Ghost Test; poll /datas/ghost_jobs/{job_id} for the result.
+    """
+    table_name = await ghost_table_name(session, config_id)
+    return await ghost_outbox.enqueue(session, table_name, [detail_id], is_alpha=False, user_id=current_user.id)
 
 
-@router.get("/{config_id}/detail/{detail_id}/send_ghost_alpha")
+@router.get("/{config_id}/detail/{detail_id}/send_ghost_alpha", response_model=GhostJobPublic, status_code=202)
 async def query_data_detail_send_ghost_alpha(
-    session: SessionDep,
+    session: AsyncSessionDep,
     config_id: str,
     detail_id: int,
     current_user: CurrentUser,
-) -> Message:
-    statement = select(DataQueryConfig).where(DataQueryConfig.id == config_id)
-    data_query = session.exec(statement).one()
-    table_name = data_query.table_name
+) -> Any:
+    """
+    Queue a record for Ghost Alpha; poll /datas/ghost_jobs/{job_id} for the result.
+    """
+    table_name = await ghost_table_name(session, config_id)
+    return await ghost_outbox.enqueue(session, table_name, [detail_id], is_alpha=True, user_id=current_user.id)
 
-    url = "http://127.0.0.1:22333/crawler/ghost_api"
-    # url = "http://192.168.14.60:22333/crawler/ghost_api"
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                url, json={"table_name": table_name, "record_id": detail_id, "is_alpha": True}, timeout=300
-            )
-
-            if response.status_code == 200:
-                return Message(message=f"Ghost 发送成功：{table_name} - {detail_id}")
-            else:
-                raise HTTPException(status_code=502, detail=f"Ghost 服务返回错误: {response.text}")
-        except httpx.RequestError as e:
-            raise HTTPException(status_code=503, detail="无法连接到 Ghost 服务")
+
+@router.post("/{config_id}/send_ghost", response_model=GhostJobPublic, status_code=202)
+async def send_ghost_bulk(
+    session: AsyncSessionDep,
+    config_id: str,
+    body: GhostBulkSend,
+    current_user: CurrentUser,
+) -> Any:
+    """
+    Queue several records for Ghost; they are sent concurrently in the background.
+    """
+    table_name = await ghost_table_name(session, config_id)
+    return await ghost_outbox.enqueue(session, table_name, body.detail_ids, body.is_alpha, user_id=current_user.id)
+
+
+@router.get("/ghost_jobs/{job_id}", response_model=GhostJobPublic)
+async def read_ghost_job(session: AsyncSessionDep, job_id: uuid.UUID, current_user: CurrentUser) -> Any:
+    """
+    Progress of a Ghost send job.
+    """
+    job = await session.get(GhostJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="推送任务不存在")
+    if job.user_id != current_user.id and current_user.is_superuser is False:
+        raise HTTPException(status_code=403, detail="用户没有足够的权限")
+    return job
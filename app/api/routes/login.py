@@ -1,25 +1,46 @@
+import math
 from datetime import timedelta
 from typing import Annotated, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncSessionDep, CurrentUser
 from app.core import security
 from app.core.config import settings
+from app.core.rate_limit import RateLimiter
 from app.cruds import auth_crud
 from app.models.basic_model import Token
 from app.models.user_model import UserPublic
 
 router = APIRouter(tags=["login"])
 
+# 每分钟补满，突发上限等于每分钟允许次数
+ip_limiter = RateLimiter(rate=settings.LOGIN_RATE_LIMIT_PER_IP / 60, capacity=settings.LOGIN_RATE_LIMIT_PER_IP)
+email_limiter = RateLimiter(rate=settings.LOGIN_RATE_LIMIT_PER_EMAIL / 60, capacity=settings.LOGIN_RATE_LIMIT_PER_EMAIL)
+
+
+def check_login_rate(request: Request, email: str) -> None:
+    """按来源 IP 和登录邮箱限流，在执行任何密码校验之前拒绝超额请求。"""
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = ip_limiter.hit(client_ip) or email_limiter.hit(email.lower())
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail="登录尝试过于频繁，请稍后重试",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
 
 @router.post("/login/access-token")
-def login_access_token(session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]) -> Token:
+async def login_access_token(
+    request: Request, session: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = auth_crud.authenticate(session=session, email=form_data.username, password=form_data.password)
+    check_login_rate(request, form_data.username)
+    user = await auth_crud.authenticate(session=session, email=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
     elif not user.is_active:
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
+from app.core.templates import template_cache
+
 router = APIRouter(tags=["pages"])
 
 
-def serve_template(template_name: str):
-    """返回指定模板的响应"""
-    with open(f"templates/{template_name}.html", encoding="utf-8") as f:
-        content = f.read()
-    return HTMLResponse(content=content)
+async def serve_template(request: Request, template_name: str):
+    """返回指定模板的响应（内容、压缩版本与 ETag 均已缓存）"""
+    return await template_cache.response(request, template_name)
 
 
 @router.get("/")
@@ -18,59 +18,59 @@ async def root_redirect():
 
 @router.get("/index", response_class=HTMLResponse)
 async def home_page(request: Request):
-    return serve_template("index")
+    return await serve_template(request, "index")
 
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    return serve_template("login")
+    return await serve_template(request, "login")
 
 
 @router.get("/task", response_class=HTMLResponse)
 async def task_page(request: Request):
-    return serve_template("task")
+    return await serve_template(request, "task")
 
 
 @router.get("/data", response_class=HTMLResponse)
 async def data_page(request: Request):
-    return serve_template("data")
+    return await serve_template(request, "data")
 
 
 @router.get("/data_query", response_class=HTMLResponse)
 async def data_query_page(request: Request):
-    return serve_template("data_query")
+    return await serve_template(request, "data_query")
 
 
 @router.get("/data_detail", response_class=HTMLResponse)
 async def data_detail_page(request: Request):
-    return serve_template("data_detail")
+    return await serve_template(request, "data_detail")
 
 
 @router.get("/aggregated_search", response_class=HTMLResponse)
 async def aggregated_search_page(request: Request):
-    return serve_template("aggregated_search")
+    return await serve_template(request, "aggregated_search")
 
 
 @router.get("/knowledge_base", response_class=HTMLResponse)
 async def knowledge_base_page(request: Request):
-    return serve_template("knowledge_base")
+    return await serve_template(request, "knowledge_base")
 
 
 @router.get("/log_view", response_class=HTMLResponse)
 async def log_view_page(request: Request):
-    return serve_template("log_view")
+    return await serve_template(request, "log_view")
 
 
 @router.get("/users", response_class=HTMLResponse)
 async def users_page(request: Request):
-    return serve_template("users")
+    return await serve_template(request, "users")
 
 
 @router.get("/profile", response_class=HTMLResponse)
 async def profile_page(request: Request):
-    return serve_template("profile")
+    return await serve_template(request, "profile")
 
 
 @router.get("/ai_comment", response_class=HTMLResponse)
 async def ai_comment_page(request: Request):
-    return serve_template("ai_comment")
+    return await serve_template(request, "ai_comment")
@@ -3,13 +3,24 @@ from typing import Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, col, func, select
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import AsyncSessionDep, CurrentUser, get_current_active_superuser
 from app.cruds import task_crud
 from app.models.basic_model import Message
-from app.models.task_model import Task, TaskCreate, TaskPublic, TasksPublic, TaskStatus, TaskUpdate
+from app.models.task_model import (
+    Task,
+    TaskCreate,
+    TaskPublic,
+    TaskRunHistoriesPublic,
+    TaskRunHistory,
+    TasksPublic,
+    TaskStatus,
+    TaskUpdate,
+)
 from app.models.user_model import User
+from app.services.cancellation import notify_kill
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -19,96 +30,100 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=TasksPublic,
 )
-def read_tasks(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_tasks(session: AsyncSessionDep, skip: int = 0, limit: int = 100) -> Any:
     count_statement = select(func.count()).select_from(Task)
-    count = session.exec(count_statement).one()
+    count = (await session.exec(count_statement)).one()
 
     statement = select(Task).order_by(col(Task.created_at).desc()).offset(skip).limit(limit)
-    tasks = session.exec(statement).all()
+    tasks = (await session.exec(statement)).all()
 
     return TasksPublic(data=tasks, count=count)
 
 
 @router.post("/", response_model=TaskPublic)
-def create_task(*, session: SessionDep, user_in: TaskCreate, current_user: CurrentUser) -> Any:
-    existing_task = task_crud.get_task_by_fp(session=session, task=user_in)
+async def create_task(*, session: AsyncSessionDep, user_in: TaskCreate, current_user: CurrentUser) -> Any:
+    existing_task = await session.run_sync(task_crud.get_task_by_fp, user_in)
     if existing_task:
         raise HTTPException(
             status_code=400,
             detail=f"该任务已在系统中存在：[{existing_task.task_group} - {existing_task.task_name}]",
         )
-    repeat_name = task_crud.check_repeat_task_name(
-        session=session, task_name=user_in.task_name, user_id=current_user.id
-    )
+    repeat_name = await session.run_sync(task_crud.check_repeat_task_name, user_in.task_name, current_user.id)
     if repeat_name:
         raise HTTPException(
             status_code=400,
             detail=f"该任务名称 [{user_in.task_name}] 重复，请更换名称。",
         )
 
-    task = task_crud.create_task(session=session, task_in=user_in, user_id=current_user.id)
+    task = await session.run_sync(
+        lambda sync_session: task_crud.create_task(session=sync_session, task_in=user_in, user_id=current_user.id)
+    )
     return task
 
 
 @router.patch("/{task_id}", response_model=TaskPublic)
-def update_task(*, session: SessionDep, task_id: uuid.UUID, user_in: TaskUpdate, current_user: CurrentUser) -> Any:
+async def update_task(
+    *, session: AsyncSessionDep, task_id: uuid.UUID, user_in: TaskUpdate, current_user: CurrentUser
+) -> Any:
     """
     Update a task.
     """
 
-    db_task = task_checker(session, current_user, task_id)
+    db_task = await task_checker(session, current_user, task_id)
 
-    db_task = task_crud.update_task(session=session, db_task=db_task, user_in=user_in)
+    db_task = await session.run_sync(task_crud.update_task, db_task, user_in)
     return db_task
 
 
 @router.patch("/{task_id}/begin/", response_model=TaskPublic)
-def begin_task(*, session: SessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Any:
+async def begin_task(*, session: AsyncSessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Any:
     """
     Begin a task.
     """
 
-    db_task = task_checker(session, current_user, task_id)
+    db_task = await task_checker(session, current_user, task_id)
     try:
-        task_crud.create_task_run(session=session, db_task=db_task)
+        await session.run_sync(task_crud.create_task_run, db_task)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    db_task = task_crud.update_status(session=session, db_task=db_task, user_in=TaskStatus.BEGIN)
+    db_task = await session.run_sync(task_crud.update_status, db_task, TaskStatus.BEGIN)
     return db_task
 
 
 @router.patch("/{task_id}/stop/", response_model=TaskPublic)
-def stop_task(*, session: SessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Any:
+async def stop_task(*, session: AsyncSessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Any:
     """
     Stop a task.
     """
 
-    db_task = task_checker(session, current_user, task_id)
-    task_crud.update_task_run(session=session, db_task=db_task, user_in={"status": TaskStatus.KILL.value})
-    db_task = task_crud.update_status(session=session, db_task=db_task, user_in=TaskStatus.KILL)
+    db_task = await task_checker(session, current_user, task_id)
+    await session.run_sync(task_crud.update_task_run, db_task, {"status": TaskStatus.KILL.value})
+    await notify_kill(session, db_task.task_fingerprint)
+    db_task = await session.run_sync(task_crud.update_status, db_task, TaskStatus.KILL)
     return db_task
 
 
 @router.patch("/{task_id}/remove/")
-def remove_task(*, session: SessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Message:
+async def remove_task(*, session: AsyncSessionDep, task_id: uuid.UUID, current_user: CurrentUser) -> Message:
     """
     Remove a task.
     """
 
-    db_task = task_checker(session, current_user, task_id)
+    db_task = await task_checker(session, current_user, task_id)
     db_task.is_delete = True
 
-    task_crud.update_task_run(session=session, db_task=db_task, user_in={"status": TaskStatus.KILL.value})
+    await session.run_sync(task_crud.update_task_run, db_task, {"status": TaskStatus.KILL.value})
+    await notify_kill(session, db_task.task_fingerprint)
 
     session.add(db_task)
-    session.commit()
-    session.refresh(db_task)
+    await session.commit()
+    await session.refresh(db_task)
     return Message(message="任务已成功删除")
 
 
-def task_checker(session: Session, current_user: User, task_id: UUID) -> type[Task] | None:
-    db_task = session.get(Task, task_id)
+async def task_checker(session: AsyncSession, current_user: User, task_id: UUID) -> Task:
+    db_task = await session.get(Task, task_id)
     if not db_task:
         raise HTTPException(
             status_code=404,
@@ -120,9 +135,9 @@ def task_checker(session: Session, current_user: User, task_id: UUID) -> type[Ta
 
 
 @router.get("/me", response_model=TasksPublic)
-def read_tasks_me(session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100) -> Any:
+async def read_tasks_me(session: AsyncSessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100) -> Any:
     count_statement = select(func.count()).select_from(Task).where(Task.user_id == current_user.id)
-    count = session.exec(count_statement).one()
+    count = (await session.exec(count_statement)).one()
 
     statement = (
         select(Task)
@@ -131,17 +146,17 @@ def read_tasks_me(session: SessionDep, current_user: CurrentUser, skip: int = 0,
         .offset(skip)
         .limit(limit)
     )
-    tasks = session.exec(statement).all()
+    tasks = (await session.exec(statement)).all()
 
     return TasksPublic(data=tasks, count=count)
 
 
 @router.get("/group", response_model=TasksPublic)
-def read_tasks_by_group(
-    session: SessionDep, current_user: CurrentUser, task_group: str, skip: int = 0, limit: int = 100
+async def read_tasks_by_group(
+    session: AsyncSessionDep, current_user: CurrentUser, task_group: str, skip: int = 0, limit: int = 100
 ) -> Any:
     count_statement = select(func.count()).select_from(Task).where(Task.task_group == task_group)
-    count = session.exec(count_statement).one()
+    count = (await session.exec(count_statement)).one()
 
     statement = (
         select(Task)
@@ -151,6 +166,49 @@ def read_tasks_by_group(
         .offset(skip)
         .limit(limit)
     )
-    tasks = session.exec(statement).all()
+    tasks = (await session.exec(statement)).all()
 
     return TasksPublic(data=tasks, count=count)
+
+
+@router.get("/{task_id}/runs", response_model=TaskRunHistoriesPublic)
+async def read_task_runs(
+    session: AsyncSessionDep, current_user: CurrentUser, task_id: uuid.UUID, skip: int = 0, limit: int = 100
+) -> Any:
+    """
+    Run history of a task, latest first.
+    """
+
+    db_task = await task_checker(session, current_user, task_id)
+    condition = TaskRunHistory.task_fingerprint == db_task.task_fingerprint
+    return await read_run_history(session, condition, skip, limit)
+
+
+@router.get(
+    "/platforms/{source_platform}/runs",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=TaskRunHistoriesPublic,
+)
+async def read_platform_runs(session: AsyncSessionDep, source_platform: str, skip: int = 0, limit: int = 100) -> Any:
+    """
+    Run history of all tasks of a source platform, latest first.
+    """
+
+    condition = TaskRunHistory.source_platform == source_platform
+    return await read_run_history(session, condition, skip, limit)
+
+
+async def read_run_history(session: AsyncSession, condition: Any, skip: int, limit: int) -> TaskRunHistoriesPublic:
+    count_statement = select(func.count()).select_from(TaskRunHistory).where(condition)
+    count = (await session.exec(count_statement)).one()
+
+    statement = (
+        select(TaskRunHistory)
+        .where(condition)
+        .order_by(col(TaskRunHistory.started_at).desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    runs = (await session.exec(statement)).all()
+
+    return TaskRunHistoriesPublic(data=runs, count=count)
@@ -60,6 +60,7 @@ def update_user_me(*, session: SessionDep, user_in: UserUpdateMe, current_user:
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    user_crud.invalidate_cached_user(current_user.id)
     return current_user
 
 
@@ -77,6 +78,7 @@ def update_password_me(*, session: SessionDep, body: UpdatePassword, current_use
     current_user.hashed_password = hashed_password
     session.add(current_user)
     session.commit()
+    user_crud.invalidate_cached_user(current_user.id)
     return Message(message="密码更新成功")
 
 
@@ -94,7 +96,7 @@ def read_user_by_id(user_id: uuid.UUID, session: SessionDep, current_user: Curre
     Get a specific user by id.
     """
     user = session.get(User, user_id)
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -144,10 +146,11 @@ def delete_user(session: SessionDep, current_user: CurrentUser, user_id: uuid.UU
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="用户不存在")
-    if user == current_user:
+    if user.id == current_user.id:
         raise HTTPException(status_code=403, detail="超级用户不允许自行删除。")
     # statement = delete(Item).where(col(Item.owner_id) == user_id)
     # session.exec(statement)
     session.delete(user)
     session.commit()
+    user_crud.invalidate_cached_user(user_id)
     return Message(message="用户已成功删除")
@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.core.db import pool_statistics
+from app.core.security import hashing_pool
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -6,3 +12,19 @@ router = APIRouter(prefix="/utils", tags=["utils"])
 @router.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/pools", dependencies=[Depends(get_current_active_superuser)])
+def read_pool_statistics() -> list[dict[str, Any]]:
+    """
+    Live connection pool statistics (checked out, overflow, waiters) of every engine.
+    """
+    return pool_statistics()
+
+
+@router.get("/hashing", dependencies=[Depends(get_current_active_superuser)])
+def read_hashing_statistics() -> dict[str, int]:
+    """
+    Password hashing pool statistics (running, pending, rejected).
+    """
+    return hashing_pool.stats()
@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from typing import Any
+
+import httpx
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 第三方前端依赖：static 下的本地路径 -> 固定版本的生产构建地址
+# 文件随代码提交，升级版本时修改地址后执行 python -m app.core.assets 重新下载；
+# 本地文件缺失时页面回退到该地址
+VENDOR_BUNDLES = {
+    "vendor/vue.global.prod.js": "https://unpkg.com/vue@3.5.13/dist/vue.global.prod.js",
+    "vendor/marked.min.js": "https://cdn.jsdelivr.net/npm/marked@15.0.7/marked.min.js",
+}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+_ASSET_REF = re.compile(rb'(?P<attr>src|href)="(?P<url>[^"]+)"')
+
+
+class AssetManifest:
+    """静态资源指纹清单。
+
+    启动时计算 ``directory`` 下每个文件的内容哈希，``/static/js/common.js``
+    对应的指纹地址为 ``/static/js/common.<hash>.js``。文件内容变化时地址随之
+    变化，因此指纹地址可以被浏览器长期缓存。页面引用的第三方依赖
+    （:data:`VENDOR_BUNDLES`）本地文件缺失时改用固定版本的 CDN 地址。
+    ``enabled`` 为 False（调试模式）时不使用指纹地址，修改静态文件后刷新即可生效。
+    """
+
+    def __init__(self, directory: str = "static", prefix: str = "/static", enabled: bool = not settings.DEBUG) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.enabled = enabled
+        self._urls: dict[str, str] = {}
+        self._files: dict[str, str] = {}
+        self._built = False
+        self._lock = threading.Lock()
+
+    def build(self) -> None:
+        urls: dict[str, str] = {}
+        files: dict[str, str] = {}
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                full_path = os.path.join(root, name)
+                path = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()[:12]
+                stem, ext = os.path.splitext(path)
+                hashed = f"{stem}.{digest}{ext}"
+                urls[path] = hashed
+                files[hashed] = path
+        with self._lock:
+            self._urls, self._files, self._built = urls, files, True
+        logger.info("Asset manifest built: %d files", len(urls))
+
+    def _ensure_built(self) -> None:
+        if not self._built:
+            self.build()
+
+    def url(self, url: str) -> str:
+        """返回页面中应使用的资源地址；未知地址原样返回。"""
+        self._ensure_built()
+        if not url.startswith(f"{self.prefix}/"):
+            return url
+        path = url[len(self.prefix) + 1 :]
+        if path in VENDOR_BUNDLES and path not in self._urls:
+            return VENDOR_BUNDLES[path]
+        hashed = self._urls.get(path)
+        if not self.enabled or hashed is None:
+            return url
+        return f"{self.prefix}/{hashed}"
+
+    def resolve(self, path: str) -> str | None:
+        """指纹路径 -> 实际文件路径（相对于 ``directory``）。"""
+        if not self.enabled:
+            return None
+        self._ensure_built()
+        return self._files.get(path)
+
+    def rewrite(self, html: bytes) -> bytes:
+        """将页面中 ``src``/``href`` 引用的静态资源替换为指纹地址。"""
+
+        def replace(match: re.Match[bytes]) -> bytes:
+            url = match.group("url").decode()
+            return b'%s="%s"' % (match.group("attr"), self.url(url).encode())
+
+        return _ASSET_REF.sub(replace, html)
+
+
+class FingerprintedStaticFiles(StaticFiles):
+    """提供静态文件，指纹地址附带一年有效的 ``immutable`` 缓存头。
+
+    非指纹地址（旧链接、调试模式）仍可访问，但要求浏览器每次重新验证。
+    """
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        original = self.manifest.resolve(path.replace(os.sep, "/"))
+        response = await super().get_response(original or path, scope)
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE if original is not None else "no-cache"
+        return response
+
+
+def download_vendor_bundles(directory: str = "static", force: bool = False) -> None:
+    """将 :data:`VENDOR_BUNDLES` 中的第三方依赖下载到本地。"""
+    with httpx.Client(follow_redirects=True, timeout=60) as client:
+        for path, url in VENDOR_BUNDLES.items():
+            target = os.path.join(directory, path)
+            if os.path.exists(target) and not force:
+                continue
+            response = client.get(url)
+            response.raise_for_status()
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(response.content)
+            logger.info("Vendored %s -> %s", url, target)
+
+
+asset_manifest = AssetManifest()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    download_vendor_bundles(force=True)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Callable
+from functools import partial
+from typing import Any, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """在线程池中执行阻塞调用（文件 I/O、同步驱动、CPU 密集计算），避免占用事件循环。
+
+    ``async def`` 路由中所有可能阻塞的调用都应经过此函数或使用 AsyncSession。
+    """
+    return await run_in_threadpool(func, *args, **kwargs)
+
+
+class LoopBlockingMonitor:
+    """调试模式下检测阻塞事件循环的代码。
+
+    一方面开启 asyncio 调试模式，执行时间超过 ``threshold`` 秒的回调会由 asyncio
+    记录日志；另一方面由独立线程监视事件循环的心跳，心跳停滞超过 ``threshold``
+    秒时记录事件循环线程当前的调用栈，直接定位阻塞的代码。
+    """
+
+    def __init__(self, threshold: float) -> None:
+        self.threshold = threshold
+        self._beat = time.monotonic()
+        self._stopping = threading.Event()
+        self._heartbeat: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.threshold
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._heartbeat = asyncio.create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("Event loop blocking monitor started (threshold %.3fs)", self.threshold)
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        if self._watchdog is not None:
+            await run_blocking(partial(self._watchdog.join, timeout=self.threshold * 2))
+            self._watchdog = None
+
+    async def _tick(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stopping.wait(self.threshold / 4):
+            beat = self._beat
+            lag = time.monotonic() - beat
+            # 同一次阻塞只报告一次
+            if lag <= self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)  # type: ignore[arg-type]
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            logger.warning("Event loop blocked for more than %.3fs, currently at:\n%s", lag, stack)
+
+    async def __aenter__(self) -> "LoopBlockingMonitor":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
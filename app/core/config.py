@@ -13,10 +13,22 @@ class Settings(BaseSettings):
     )
 
     PROJECT_NAME: str
+    # 调试模式：开启事件循环阻塞检测，回调占用事件循环超过阈值（秒）时记录日志及调用栈
+    DEBUG: bool = False
+    LOOP_BLOCK_THRESHOLD: float = 0.1
     API_VERSION_STR: str = "/api/v1"
     SECRET_KEY: str = secrets.token_urlsafe(32)
     # 60 minutes * 24 hours * 8 days = 8 days
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # 已认证用户缓存时间（秒），0 表示不缓存
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_SIZE: int = 4096
+    # 密码哈希线程池大小及最大排队数，排满后返回 429
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    # 登录限流：每个 IP / 每个邮箱每分钟允许的尝试次数
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 10
 
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
@@ -24,6 +36,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
 
+    # 应用数据库连接池：大小、溢出、回收周期（秒）、获取连接超时（秒）
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_PRE_PING: bool = True
+    # 应用数据库语句超时（秒），0 表示不限制
+    DB_STATEMENT_TIMEOUT: int = 0
+    # psycopg 语句执行多少次后转为服务端预编译，负数表示禁用（使用 PgBouncer 事务池时）
+    DB_PREPARE_THRESHOLD: int = 5
+
     @computed_field  # type: ignore[prop-decorator]
     @property
     def sqlalchemy_database_uri(self) -> PostgresDsn:
@@ -37,6 +60,70 @@ class Settings(BaseSettings):
         )
 
     DATA_CENTER_URI: str
+    # 每个数据中心连接（DataQueryConfig.db_uri）各自的连接池大小，及空闲多久后释放（秒）
+    DATA_CENTER_POOL_SIZE: int = 5
+    DATA_CENTER_MAX_OVERFLOW: int = 10
+    DATA_CENTER_POOL_RECYCLE: int = 1800
+    DATA_CENTER_POOL_TIMEOUT: int = 30
+    DATA_CENTER_ENGINE_IDLE_TIMEOUT: int = 600
+    # 数据中心默认语句超时（秒），0 表示不限制
+    DATA_CENTER_STATEMENT_TIMEOUT: int = 0
+    # 数据中心表结构反射缓存时间（秒）
+    DATA_SCHEMA_CACHE_TTL: int = 600
+    # 数据中心表行数缓存刷新周期（秒）及后台计数线程数
+    DATA_COUNT_CACHE_TTL: int = 300
+    DATA_COUNT_REFRESH_WORKERS: int = 2
+    # 数据导出时服务端游标每批读取的行数
+    DATA_EXPORT_BATCH_SIZE: int = 1000
+    # 保存的 SQL 查询的执行超时（秒）与可分页访问的最大行数
+    DATA_QUERY_TIMEOUT: int = 30
+    DATA_QUERY_MAX_ROWS: int = 10000
+    # 保存的 SQL 查询结果默认缓存时间（秒，可由 DataQuery.cache_ttl 覆盖）与进程内最多缓存的结果页数，TTL 为 0 时不缓存
+    DATA_QUERY_CACHE_TTL: int = 60
+    DATA_QUERY_CACHE_SIZE: int = 256
+    # 多个进程共享查询结果缓存时使用的 Redis 地址（需安装 redis），为空时使用进程内缓存
+    DATA_QUERY_CACHE_REDIS_URL: str | None = None
+    # 数据导出查询的执行超时（秒）
+    DATA_EXPORT_TIMEOUT: int = 600
+    # 任务调度器从数据库同步 TaskRun 的间隔（秒）、每批认领的任务数及 CRON 表达式所用时区
+    SCHEDULER_SYNC_INTERVAL: int = 30
+    SCHEDULER_BATCH_SIZE: int = 100
+    SCHEDULER_TIMEZONE: str = "UTC"
+    # 执行中的 TaskRun 的租约（秒）：超过该时间未刷新心跳的任务会被重新认领
+    SCHEDULER_RUN_LEASE: int = 300
+    # 抓取时全局及每个资源平台同时进行的请求数上限（平台上限可由 Rule.crawl_rule["concurrency"] 覆盖）
+    CRAWL_MAX_CONCURRENCY: int = 100
+    CRAWL_PLATFORM_CONCURRENCY: int = 8
+    CRAWL_TIMEOUT: int = 30
+    CRAWL_USER_AGENT: str = "Mozilla/5.0 (compatible; payipa-crawler/1.0)"
+    # 每个站点的默认请求速率（个/秒）、突发量及自适应调整的上下限，可由 Rule.crawl_rule["rate_limit"] 覆盖
+    CRAWL_HOST_RATE: float = 2.0
+    CRAWL_HOST_BURST: float = 5.0
+    CRAWL_HOST_MIN_RATE: float = 0.1
+    CRAWL_HOST_MAX_RATE: float = 20.0
+    # 站点限速状态目录，设置后同一节点上的多个抓取进程共享限速额度
+    CRAWL_RATE_STATE_DIR: str | None = None
+    # URL 去重布隆过滤器的目录（为空时只保存在内存中）、容量及误判率
+    CRAWL_FRONTIER_DIR: str | None = None
+    CRAWL_SEEN_CAPACITY: int = 10_000_000
+    CRAWL_SEEN_ERROR_RATE: float = 0.001
+    # 抓取结果写入数据中心时每批的行数及最长缓冲时间（秒）
+    CRAWL_WRITE_BATCH_SIZE: int = 500
+    CRAWL_WRITE_FLUSH_INTERVAL: float = 2.0
+    # 抓取进程检查任务是否被停止（KILL）的间隔（秒）；PostgreSQL 上还会通过 LISTEN/NOTIFY 即时通知
+    CRAWL_CANCEL_POLL_INTERVAL: float = 0.5
+
+    # Ghost 推送服务地址、单次请求超时（秒）、连接池大小及每个推送任务的并发数
+    GHOST_API_URL: str = "http://127.0.0.1:22333/crawler/ghost_api"
+    GHOST_TIMEOUT: int = 300
+    GHOST_MAX_CONNECTIONS: int = 20
+    GHOST_BULK_CONCURRENCY: int = 8
+    # 后台推送：轮询间隔（秒）、每个进程同时执行的任务数、任务租约（秒）、单条记录的重试次数及最长退避（秒）
+    GHOST_DISPATCH_INTERVAL: float = 2.0
+    GHOST_DISPATCH_JOBS: int = 4
+    GHOST_JOB_LEASE: int = 120
+    GHOST_RETRY_ATTEMPTS: int = 5
+    GHOST_RETRY_MAX_WAIT: int = 60
 
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
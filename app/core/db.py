@@ -1,12 +1,211 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine, select
 
 from app.core.config import settings
 from app.cruds import user_crud
 from app.models.user_model import User, UserCreate
 
-engine = create_engine(str(settings.sqlalchemy_database_uri))
+# 同步驱动 -> 对应的 asyncio 驱动
+ASYNC_DRIVERS = {
+    "postgresql": "psycopg",
+    "mysql": "aiomysql",
+    "mariadb": "aiomysql",
+}
+
+
+def to_async_uri(uri: str) -> str:
+    """将同步连接 URI 转换为使用 asyncio 驱动的 URI，例如 mysql+pymysql -> mysql+aiomysql。"""
+    url = make_url(uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None or url.get_driver_name() == driver:
+        return uri
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def connect_args(uri: str, statement_timeout: float = 0, prepare_threshold: int | None = None) -> dict[str, Any]:
+    """按方言生成 DBAPI 连接参数。
+
+    ``statement_timeout`` 为每个连接的默认语句超时（秒，0 表示不限制）；
+    ``prepare_threshold`` 仅对 psycopg 生效，语句执行多少次后转为服务端预编译，
+    None 表示禁用预编译（例如经由 PgBouncer 事务池连接时）。
+    """
+    url = make_url(uri)
+    milliseconds = int(statement_timeout * 1000)
+    args: dict[str, Any] = {}
+    if url.get_backend_name() == "postgresql":
+        if milliseconds:
+            args["options"] = f"-c statement_timeout={milliseconds}"
+        if url.get_driver_name() == "psycopg":
+            args["prepare_threshold"] = prepare_threshold
+    elif url.get_backend_name() in ("mysql", "mariadb") and milliseconds:
+        args["init_command"] = f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}"
+    return args
+
+
+_prepare_threshold = settings.DB_PREPARE_THRESHOLD if settings.DB_PREPARE_THRESHOLD >= 0 else None
+
+_engine_options: dict[str, Any] = {
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "connect_args": connect_args(
+        str(settings.sqlalchemy_database_uri), settings.DB_STATEMENT_TIMEOUT, _prepare_threshold
+    ),
+}
+
+engine = create_engine(str(settings.sqlalchemy_database_uri), **_engine_options)
+
+async_engine = create_async_engine(str(settings.sqlalchemy_database_uri), **_engine_options)
+
+
+class EngineRegistry:
+    """按连接 URI 懒加载并复用连接池。
+
+    每个不同的 URI 对应一个带 pre-ping 的 engine，连接参数按 URI 的方言生成；
+    除默认 URI 外，空闲超过 ``idle_timeout`` 秒且没有借出连接的 engine 会被释放。
+    """
+
+    def __init__(
+        self,
+        default_uri: str,
+        idle_timeout: float,
+        engine_factory: Callable[..., Any] = create_engine,
+        statement_timeout: float = 0,
+        **engine_kwargs: Any,
+    ) -> None:
+        self.default_uri = default_uri
+        self.idle_timeout = idle_timeout
+        self.engine_factory = engine_factory
+        self.statement_timeout = statement_timeout
+        self.engine_kwargs = engine_kwargs
+        self._engines: dict[str, Any] = {}
+        self._last_used: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._disposing: set[asyncio.Task] = set()
+
+    def get(self, uri: str | None = None) -> Any:
+        uri = uri or self.default_uri
+        now = time.monotonic()
+        with self._lock:
+            db_engine = self._engines.get(uri)
+            if db_engine is None:
+                db_engine = self.engine_factory(
+                    uri,
+                    pool_pre_ping=True,
+                    connect_args=connect_args(uri, self.statement_timeout, _prepare_threshold),
+                    **self.engine_kwargs,
+                )
+                self._engines[uri] = db_engine
+            self._last_used[uri] = now
+            self._evict_idle(now)
+        return db_engine
+
+    def engines(self) -> dict[str, Any]:
+        with self._lock:
+            return dict(self._engines)
+
+    def _evict_idle(self, now: float) -> None:
+        for uri, last_used in list(self._last_used.items()):
+            if uri == self.default_uri or now - last_used < self.idle_timeout:
+                continue
+            db_engine = self._engines[uri]
+            if getattr(db_engine.pool, "checkedout", lambda: 0)():
+                continue
+            del self._engines[uri]
+            del self._last_used[uri]
+            self._dispose(db_engine)
+
+    def _dispose(self, db_engine: Engine | AsyncEngine) -> None:
+        if not isinstance(db_engine, AsyncEngine):
+            db_engine.dispose()
+            return
+        # AsyncEngine 需要在事件循环中关闭连接
+        try:
+            task = asyncio.get_running_loop().create_task(db_engine.dispose())
+        except RuntimeError:
+            db_engine.sync_engine.dispose(close=False)
+        else:
+            self._disposing.add(task)
+            task.add_done_callback(self._disposing.discard)
+
+    def dispose_all(self) -> None:
+        with self._lock:
+            for db_engine in self._engines.values():
+                self._dispose(db_engine)
+            self._engines.clear()
+            self._last_used.clear()
+
+
+_data_center_options: dict[str, Any] = {
+    "idle_timeout": settings.DATA_CENTER_ENGINE_IDLE_TIMEOUT,
+    "statement_timeout": settings.DATA_CENTER_STATEMENT_TIMEOUT,
+    "pool_size": settings.DATA_CENTER_POOL_SIZE,
+    "max_overflow": settings.DATA_CENTER_MAX_OVERFLOW,
+    "pool_recycle": settings.DATA_CENTER_POOL_RECYCLE,
+    "pool_timeout": settings.DATA_CENTER_POOL_TIMEOUT,
+}
+
+data_center_engines = EngineRegistry(settings.DATA_CENTER_URI, **_data_center_options)
+
+data_center_engine = data_center_engines.get()
+
+async_data_center_engines = EngineRegistry(
+    to_async_uri(settings.DATA_CENTER_URI), engine_factory=create_async_engine, **_data_center_options
+)
+
+
+def get_data_center_engine(db_uri: str | None = None) -> Engine:
+    """返回 ``DataQueryConfig.db_uri`` 对应的数据中心 engine，为空时使用 DATA_CENTER_URI。"""
+    return data_center_engines.get(db_uri)
+
+
+def get_async_data_center_engine(db_uri: str | None = None) -> AsyncEngine:
+    """返回 ``DataQueryConfig.db_uri`` 对应的 asyncio 数据中心 engine，为空时使用 DATA_CENTER_URI。"""
+    return async_data_center_engines.get(to_async_uri(db_uri) if db_uri else None)
+
+
+def _pool_waiters(pool: Any) -> int | None:
+    # QueuePool 使用带 Condition 的线程队列，AsyncAdaptedQueuePool 使用 asyncio.Queue
+    queue = getattr(pool, "_pool", None)
+    waiters = getattr(getattr(queue, "not_empty", None), "_waiters", None)
+    if waiters is None:
+        waiters = getattr(getattr(queue, "_queue", None), "_getters", None)
+    return len(waiters) if waiters is not None else None
+
+
+def pool_status(name: str, db_engine: Engine | AsyncEngine) -> dict[str, Any]:
+    """返回连接池的实时状态：容量、空闲、借出、溢出和等待连接的调用方数量。"""
+    pool = db_engine.pool
+    status: dict[str, Any] = {
+        "name": name,
+        "url": db_engine.url.render_as_string(hide_password=True),
+        "pool": type(pool).__name__,
+    }
+    for attr in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, attr, None)
+        if callable(method):
+            status[attr] = method()
+    status["waiters"] = _pool_waiters(pool)
+    return status
+
 
-data_center_engine = create_engine(settings.DATA_CENTER_URI, pool_pre_ping=True)
+def pool_statistics() -> list[dict[str, Any]]:
+    """汇总应用数据库和所有已创建的数据中心连接池的状态。"""
+    stats = [pool_status("app", engine), pool_status("app-async", async_engine)]
+    stats.extend(pool_status("data-center", db_engine) for db_engine in data_center_engines.engines().values())
+    stats.extend(
+        pool_status("data-center-async", db_engine) for db_engine in async_data_center_engines.engines().values()
+    )
+    return stats
 
 
 def init_db(session: Session) -> None:
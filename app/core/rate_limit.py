@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+
+
+class TokenBucket:
+    """令牌桶：以 ``rate`` 个/秒的速度补充令牌，最多积攒 ``capacity`` 个。
+
+    ``rate`` 可以在运行时调整（例如按响应情况自适应）。本类自身不加锁，
+    并发访问时由调用方负责同步。
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(now - self.updated_at, 0.0)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def consume(self, tokens: float = 1.0) -> float:
+        """尝试取出 ``tokens`` 个令牌；成功返回 0，否则返回需要等待的秒数。"""
+        self._refill(time.monotonic())
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (tokens - self.tokens) / self.rate
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """预订 ``tokens`` 个令牌（允许透支），返回调用方应等待的秒数。"""
+        self._refill(time.monotonic())
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate if self.rate > 0 else float("inf")
+
+
+class RateLimiter:
+    """按键（IP、邮箱等）维护令牌桶的进程内限流器。
+
+    最多保留 ``max_keys`` 个桶，超出时淘汰最久未访问的键。
+    """
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 100_000) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[Hashable, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: Hashable, tokens: float = 1.0) -> float:
+        """记录一次访问；允许时返回 0，被限流时返回建议的重试等待秒数。"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.capacity)
+                self._buckets[key] = bucket
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket.consume(tokens)
@@ -1,5 +1,9 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from pwdlib import PasswordHash
@@ -18,6 +22,84 @@ password_hash = PasswordHash(
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class HashingPoolBusy(Exception):
+    """密码哈希线程池及其等待队列已满。"""
+
+
+class HashingPool:
+    """执行密码哈希/校验的有界线程池。
+
+    Argon2 (m=65536) 每次计算约占用 64 MB 内存和大量 CPU，放到请求线程上执行会在
+    登录高峰时拖垮其他路由。argon2-cffi 和 bcrypt 计算期间会释放 GIL，线程池即可
+    真正并行；同时执行的任务数为 ``workers``，最多再排队 ``max_pending`` 个，
+    超出时立即抛出 :class:`HashingPoolBusy`。
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingPoolBusy("密码校验请求过多，请稍后重试")
+        with self._lock:
+            self._pending += 1
+        future = self._executor.submit(self._run, fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """在线程池中执行并阻塞等待结果。"""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """在线程池中执行，不阻塞事件循环。"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._pending -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _release(self, future: Future) -> None:
+        # 排队期间被取消（如等待结果的协程被取消）的任务不会进入 _run
+        if future.cancelled():
+            with self._lock:
+                self._pending -= 1
+        self._slots.release()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "pending": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+hashing_pool = HashingPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_SIZE)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(UTC) + expires_delta
@@ -27,8 +109,12 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
 
 
 def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
-    return password_hash.verify_and_update(plain_password, hashed_password)
+    return hashing_pool.run(password_hash.verify_and_update, plain_password, hashed_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await hashing_pool.run_async(password_hash.verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return password_hash.hash(password)
+    return hashing_pool.run(password_hash.hash, password)
@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from fastapi import Request, Response
+
+from app.core.assets import asset_manifest
+from app.core.concurrency import run_blocking
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时只提供 gzip
+    brotli = None
+
+
+@dataclass(frozen=True)
+class CachedTemplate:
+    mtime: float
+    etag: str
+    body: bytes
+    gzip: bytes
+    br: bytes | None
+
+
+class TemplateCache:
+    """页面模板缓存。
+
+    模板只在首次访问时读取，同时预先生成 gzip（及 brotli）压缩版本和强 ETag；
+    之后的请求直接返回缓存内容，``If-None-Match`` 命中时返回 304。
+    ``reload`` 为 True（调试模式）时每次访问检查文件修改时间，变化后重新加载。
+    ``transform`` 在加载时处理模板内容（如替换静态资源地址），结果同样被缓存。
+    """
+
+    def __init__(
+        self,
+        directory: str = "templates",
+        reload: bool = settings.DEBUG,
+        transform: Callable[[bytes], bytes] | None = None,
+    ) -> None:
+        self.directory = directory
+        self.reload = reload
+        self.transform = transform
+        self._templates: dict[str, CachedTemplate] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.html")
+
+    def load(self, name: str) -> CachedTemplate:
+        path = self.path(name)
+        mtime = os.stat(path).st_mtime
+        cached = self._templates.get(name)
+        if cached is not None and cached.mtime == mtime:
+            return cached
+
+        with open(path, "rb") as f:
+            body = f.read()
+        if self.transform is not None:
+            body = self.transform(body)
+        cached = CachedTemplate(
+            mtime=mtime,
+            etag=hashlib.sha1(body).hexdigest()[:20],
+            body=body,
+            gzip=gzip.compress(body, compresslevel=9, mtime=0),
+            br=brotli.compress(body) if brotli is not None else None,
+        )
+        with self._lock:
+            self._templates[name] = cached
+        return cached
+
+    async def get(self, name: str) -> CachedTemplate:
+        cached = self._templates.get(name)
+        if cached is not None and not self.reload:
+            return cached
+        return await run_blocking(self.load, name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._templates.clear()
+
+    async def response(self, request: Request, name: str) -> Response:
+        template = await self.get(name)
+
+        accept_encoding = request.headers.get("accept-encoding", "")
+        if template.br is not None and "br" in accept_encoding:
+            body, encoding = template.br, "br"
+        elif "gzip" in accept_encoding:
+            body, encoding = template.gzip, "gzip"
+        else:
+            body, encoding = template.body, None
+
+        # 强 ETag 区分不同的压缩编码
+        etag = f'"{template.etag}-{encoding}"' if encoding else f'"{template.etag}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in (tag.strip() for tag in if_none_match.split(",")) or if_none_match.strip() == "*":
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="text/html", headers=headers)
+
+
+template_cache = TemplateCache(transform=asset_manifest.rewrite)
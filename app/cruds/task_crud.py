@@ -3,8 +3,9 @@ from typing import Any
 
 from sqlmodel import Session, select
 
+from app.models.basic_model import get_datetime_utc
 from app.models.spider_model import Rule
-from app.models.task_model import Task, TaskCreate, TaskRun
+from app.models.task_model import Task, TaskCreate, TaskRun, TaskStatus
 from app.utils import SecureUtil
 
 
@@ -74,12 +75,20 @@ def create_task_run(session, db_task: Task):
         priority=task_content["priority"],
         cron_expr=task_content["cron_expr"],
         crawl_task=crawl_task,
+        status=TaskStatus.BEGIN.value,
+        enabled=True,
+        # 立即进入调度，CRON 任务由调度器推算首次触发时间
+        next_fire_at=get_datetime_utc(),
+        heartbeat_at=None,
     )
 
     task_run_statement = select(TaskRun).where(TaskRun.task_fingerprint == db_task.task_fingerprint)
     db_task_run = session.exec(task_run_statement).first()
     if db_task_run:
-        db_task_run.sqlmodel_update(new_task_run)
+        if db_task_run.status == TaskStatus.IN_PROGRESS.value:
+            raise Exception("任务正在运行，请先停止")
+        # 保留原主键，运行中的 worker 与历史记录均按 id 关联
+        db_task_run.sqlmodel_update(new_task_run.model_dump(exclude={"id"}))
     else:
         db_task_run = new_task_run
     session.add(db_task_run)
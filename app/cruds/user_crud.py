@@ -1,11 +1,18 @@
+import uuid
 from typing import Any
 
 from pydantic import EmailStr
+from sqlalchemy.orm import make_transient_to_detached
 from sqlmodel import Session, select
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import get_password_hash
 from app.models.user_model import User, UserCreate, UserUpdate
 
+# 已认证用户的短时缓存，键为用户 ID；每个进程各自缓存，其他进程最多滞后 USER_CACHE_TTL 秒
+_user_cache = TTLCache(ttl=settings.USER_CACHE_TTL, maxsize=settings.USER_CACHE_SIZE)
+
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
     db_obj = User.model_validate(user_create, update={"hashed_password": get_password_hash(user_create.password)})
@@ -26,6 +33,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_cached_user(db_user.id)
     return db_user
 
 
@@ -33,3 +41,22 @@ def get_user_by_email(*, session: Session, email: str | EmailStr) -> User | None
     statement = select(User).where(User.email == email)
     session_user = session.exec(statement).first()
     return session_user
+
+
+def get_cached_user(user_id: uuid.UUID | str) -> User | None:
+    """从缓存中取出用户，返回一个新的 detached 实例，可直接加入任意会话。"""
+    data = _user_cache.get(str(user_id))
+    if data is None:
+        return None
+    user = User.model_validate(data)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    if settings.USER_CACHE_TTL > 0:
+        _user_cache.set(str(user.id), user.model_dump())
+
+
+def invalidate_cached_user(user_id: uuid.UUID | str) -> None:
+    _user_cache.pop(str(user_id))
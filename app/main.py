@@ -1,12 +1,20 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
-from fastapi.staticfiles import StaticFiles
 
 from app.api.main import api_router, pages_router
+from app.core.assets import FingerprintedStaticFiles, asset_manifest
+from app.core.concurrency import LoopBlockingMonitor, run_blocking
 from app.core.config import settings
+from app.core.security import HashingPoolBusy
+from app.services.ghost import ghost_client
+from app.services.ghost_outbox import ghost_dispatcher
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -15,13 +23,26 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 
 PROD = False
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    await run_blocking(asset_manifest.build)
+    async with ghost_client, ghost_dispatcher:
+        if settings.DEBUG:
+            async with LoopBlockingMonitor(settings.LOOP_BLOCK_THRESHOLD):
+                yield
+        else:
+            yield
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_VERSION_STR}/openapi.json" if not PROD else None,
     generate_unique_id_function=custom_generate_unique_id,
 )
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", FingerprintedStaticFiles(directory="static", manifest=asset_manifest), name="static")
 
 # Add GZip middleware (compress responses > 1KB)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
@@ -35,6 +56,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(_request: Request, exc: HashingPoolBusy) -> JSONResponse:
+    return JSONResponse(status_code=429, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 app.include_router(pages_router)
 app.include_router(api_router, prefix=settings.API_VERSION_STR)
 
@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime
+from sqlalchemy import SMALLINT, DateTime
+from sqlalchemy.dialects.postgresql import JSON
 from sqlmodel import Field, SQLModel
 
 from app.models.basic_model import get_datetime_utc
@@ -34,6 +35,8 @@ class DataQuery(SQLModel, table=True):
     name: str = Field(default="", max_length=50, unique=True, index=True, sa_column_kwargs={"comment": "名称"})
     sql: str = Field(default="", max_length=1000, sa_column_kwargs={"comment": "SQL 查询"})
     config_id: uuid.UUID
+    # 为空时使用 DATA_QUERY_CACHE_TTL，为 0 时不缓存
+    cache_ttl: int | None = Field(default=None, sa_column_kwargs={"comment": "结果缓存时间（秒）"})
 
     enabled: bool = False
     created_at: datetime | None = Field(
@@ -61,6 +64,7 @@ class DataQueryPublic(SQLModel):
     id: uuid.UUID
     name: str
     sql: str
+    cache_ttl: int | None = None
     created_at: datetime | None = None
 
 
@@ -79,6 +83,8 @@ class QueryDataPublic(SQLModel):
 class QueryDatasPublic(SQLModel):
     data: list[QueryDataPublic]
     count: int
+    count_type: str = "exact"
+    next_cursor: str | None = None
 
 
 class QueryDataPublicDetail(SQLModel):
@@ -90,3 +96,51 @@ class QueryDataPublicDetail(SQLModel):
     author: str
     publish_time: datetime
     content: str
+
+
+class GhostBulkSend(SQLModel):
+    detail_ids: list[int] = Field(min_length=1, max_length=1000)
+    is_alpha: bool = False
+
+
+class GhostJob(SQLModel, table=True):
+    __tablename__ = "ghost_job"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    table_name: str = Field(default="", max_length=50, sa_column_kwargs={"comment": "数据表"})
+    is_alpha: bool = False
+    record_ids: list[int] = Field(default=[], sa_type=JSON, sa_column_kwargs={"comment": "待推送的记录 ID"})
+    remaining_ids: list[int] = Field(default=[], sa_type=JSON, sa_column_kwargs={"comment": "尚未推送的记录 ID"})
+    errors: dict[str, str] = Field(default={}, sa_type=JSON, sa_column_kwargs={"comment": "推送失败的记录及原因"})
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    attempts: int = Field(default=0, sa_column_kwargs={"comment": "被认领执行的次数"})
+    status: int = Field(default=0, sa_type=SMALLINT, index=True, sa_column_kwargs={"comment": "推送任务状态"})
+    created_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
+    finished_at: datetime | None = Field(default=None, sa_type=DateTime(timezone=True))  # type: ignore
+
+    # 关联用户
+    user_id: uuid.UUID = Field(foreign_key="user.id", index=True)
+
+
+class GhostJobPublic(SQLModel):
+    id: uuid.UUID
+    table_name: str
+    is_alpha: bool
+    total: int
+    succeeded: int
+    failed: int
+    errors: dict[str, str]
+    attempts: int
+    status: int
+    created_at: datetime
+    updated_at: datetime
+    finished_at: datetime | None
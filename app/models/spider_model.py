@@ -26,3 +26,16 @@ class Rule(SQLModel, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+
+
+class PageFingerprint(SQLModel, table=True):
+    __tablename__ = "page_fingerprint"
+
+    url_fingerprint: str = Field(max_length=32, primary_key=True, sa_column_kwargs={"comment": "URL MD5"})
+    etag: str | None = Field(default=None, max_length=255, sa_column_kwargs={"comment": "ETag 响应头"})
+    last_modified: str | None = Field(default=None, max_length=64, sa_column_kwargs={"comment": "Last-Modified 响应头"})
+    content_hash: str = Field(max_length=32, sa_column_kwargs={"comment": "页面内容 MD5"})
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),  # type: ignore
+    )
@@ -3,7 +3,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import SMALLINT, TEXT, DateTime
+from sqlalchemy import BIGINT, SMALLINT, TEXT, DateTime
 from sqlalchemy.dialects.postgresql import JSON
 from sqlmodel import Field, SQLModel
 
@@ -92,3 +92,63 @@ class TaskRun(SQLModel, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    # 下次触发时间，为空时不再调度；调度器只读取即将到期的行
+    next_fire_at: datetime | None = Field(
+        default=None,
+        index=True,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"comment": "下次触发时间"},
+    )
+    # 执行中的任务定期刷新，超过 SCHEDULER_RUN_LEASE 秒未刷新视为执行进程已退出
+    heartbeat_at: datetime | None = Field(
+        default=None,
+        index=True,
+        sa_type=DateTime(timezone=True),  # type: ignore
+        sa_column_kwargs={"comment": "执行心跳时间"},
+    )
+
+
+class TaskRunHistory(SQLModel, table=True):
+    __tablename__ = "task_run_history"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    task_run_id: uuid.UUID = Field(index=True)
+    task_fingerprint: str = Field(max_length=32, index=True)
+    source_platform: str = Field(default="", max_length=50, index=True, sa_column_kwargs={"comment": "资源平台"})
+    status: int = Field(sa_type=SMALLINT, sa_column_kwargs={"comment": "抓取任务结束状态"})
+    error_reason: str | None = Field(default=None, sa_type=TEXT, sa_column_kwargs={"comment": "抓取任务异常原因"})
+    started_at: datetime = Field(sa_type=DateTime(timezone=True), index=True)  # type: ignore
+    finished_at: datetime = Field(sa_type=DateTime(timezone=True))  # type: ignore
+    duration: float = Field(default=0, sa_column_kwargs={"comment": "耗时（秒）"})
+    pages: int = Field(default=0, sa_column_kwargs={"comment": "抓取页面数"})
+    bytes: int = Field(default=0, sa_type=BIGINT, sa_column_kwargs={"comment": "下载字节数"})
+    rows: int = Field(default=0, sa_column_kwargs={"comment": "写入行数"})
+    errors: int = Field(default=0, sa_column_kwargs={"comment": "请求错误数"})
+    unchanged: int = Field(default=0, sa_column_kwargs={"comment": "未变化页面数"})
+    latency_p50: float | None = Field(default=None, sa_column_kwargs={"comment": "请求耗时中位数（秒）"})
+    latency_p95: float | None = Field(default=None, sa_column_kwargs={"comment": "请求耗时 P95（秒）"})
+    throughput: float = Field(default=0, sa_column_kwargs={"comment": "每秒抓取页面数"})
+
+
+class TaskRunHistoryPublic(SQLModel):
+    id: uuid.UUID
+    task_fingerprint: str
+    source_platform: str
+    status: int
+    error_reason: str | None
+    started_at: datetime
+    finished_at: datetime
+    duration: float
+    pages: int
+    bytes: int
+    rows: int
+    errors: int
+    unchanged: int
+    latency_p50: float | None
+    latency_p95: float | None
+    throughput: float
+
+
+class TaskRunHistoriesPublic(SQLModel):
+    data: list[TaskRunHistoryPublic]
+    count: int
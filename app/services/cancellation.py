@@ -0,0 +1,107 @@
+import asyncio
+import logging
+
+import psycopg
+from sqlalchemy import text
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models.task_model import TaskRun, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL 通知频道，payload 为 task_fingerprint
+KILL_CHANNEL = "task_run_kill"
+
+
+async def notify_kill(session: AsyncSession, task_fingerprint: str) -> None:
+    """通知正在执行该任务的抓取进程立即停止，随调用方的事务提交后送达。
+
+    非 PostgreSQL 数据库不做任何事，由 :class:`CancellationWatcher` 轮询发现。
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(
+            text("SELECT pg_notify(:channel, :payload)"), {"channel": KILL_CHANNEL, "payload": task_fingerprint}
+        )
+
+
+class CancellationWatcher:
+    """监听 KILL 信号并取消正在执行的抓取协程。
+
+    每 ``poll_interval`` 秒查询一次正在执行的任务中状态已变为 KILL 的；
+    PostgreSQL 上另外 LISTEN :data:`KILL_CHANNEL`，收到通知后立即取消。
+    取消会中断进行中的 HTTP 请求并放弃尚未写入的数据。
+    """
+
+    def __init__(self, poll_interval: float = settings.CRAWL_CANCEL_POLL_INTERVAL) -> None:
+        self.poll_interval = poll_interval
+        self._running: dict[str, asyncio.Task] = {}
+        self._killed: set[str] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    def register(self, task_fingerprint: str, task: asyncio.Task) -> None:
+        self._killed.discard(task_fingerprint)
+        self._running[task_fingerprint] = task
+
+    def unregister(self, task_fingerprint: str) -> None:
+        self._running.pop(task_fingerprint, None)
+        self._killed.discard(task_fingerprint)
+
+    def killed(self, task_fingerprint: str) -> bool:
+        """任务是否因 KILL 被取消（用于区分进程退出等其他原因的取消）。"""
+        return task_fingerprint in self._killed
+
+    def cancel(self, task_fingerprint: str) -> bool:
+        task = self._running.get(task_fingerprint)
+        if task is None or task.done():
+            return False
+        logger.info("Cancelling killed task %s", task_fingerprint)
+        self._killed.add(task_fingerprint)
+        task.cancel()
+        return True
+
+    async def start(self) -> None:
+        self._tasks.append(asyncio.create_task(self._poll()))
+        if async_engine.dialect.name == "postgresql":
+            self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self._running:
+                continue
+            statement = select(TaskRun.task_fingerprint).where(
+                col(TaskRun.task_fingerprint).in_(list(self._running)),
+                TaskRun.status == TaskStatus.KILL.value,
+            )
+            try:
+                async with AsyncSession(async_engine) as session:
+                    killed = (await session.exec(statement)).all()
+            except Exception:
+                logger.exception("Polling killed tasks failed")
+                continue
+            for task_fingerprint in killed:
+                self.cancel(task_fingerprint)
+
+    async def _listen(self) -> None:
+        conninfo = async_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as connection:
+                    await connection.execute(f"LISTEN {KILL_CHANNEL}")
+                    async for notify in connection.notifies():
+                        self.cancel(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # 断线期间依靠轮询，稍后重连
+                logger.exception("Listening on %s failed", KILL_CHANNEL)
+                await asyncio.sleep(self.poll_interval * 10)
@@ -0,0 +1,405 @@
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+import httpx
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models.spider_model import Rule
+from app.models.task_model import Task, TaskRun, TaskRunHistory, TaskStatus
+from app.services.cancellation import CancellationWatcher
+from app.services.frontier import URLFrontier, seen_filter
+from app.services.incremental import PageStore
+from app.services.politeness import HostPolicy, host_limiter
+from app.services.writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+
+# 耗时直方图相邻桶相差 5%，百分位数误差不超过 5%；1ms 以下计入第一个桶
+LATENCY_BUCKET_BASE = 1.05
+LATENCY_FLOOR = 0.001
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    bytes: int = 0
+    errors: int = 0
+    unchanged: int = 0
+    rows: int = 0
+    # 请求耗时直方图：桶序号 -> 请求数，内存占用与抓取页数无关
+    latencies: dict[int, int] = field(default_factory=dict)
+
+    def record_latency(self, latency: float) -> None:
+        bucket = max(math.ceil(math.log(max(latency, LATENCY_FLOOR) / LATENCY_FLOOR, LATENCY_BUCKET_BASE)), 0)
+        self.latencies[bucket] = self.latencies.get(bucket, 0) + 1
+
+    def percentile(self, q: float) -> float | None:
+        """请求耗时的第 ``q`` 百分位数（秒，所在桶的上界），没有请求时为 None。"""
+        total = sum(self.latencies.values())
+        if not total:
+            return None
+        rank = min(int(total * q / 100), total - 1)
+        seen = 0
+        for bucket in sorted(self.latencies):
+            seen += self.latencies[bucket]
+            if seen > rank:
+                break
+        return LATENCY_FLOOR * LATENCY_BUCKET_BASE**bucket
+
+
+@dataclass
+class CrawlContext:
+    """传给抓取处理函数的上下文。
+
+    ``fetch`` 发出的请求共享连接池，受全局及 ``source_platform`` 的并发上限约束，
+    并按 ``crawl_rule["rate_limit"]`` 对每个站点限速。
+
+    ``crawl_rule["incremental"]`` 或 ``crawl_task["incremental"]`` 为真时启用增量抓取：
+    GET 请求自动携带 If-None-Match / If-Modified-Since，处理函数用 :meth:`changed`
+    跳过未变化的页面，只写入有变化的数据。
+
+    处理函数通过 :meth:`write` 输出记录，按 ``crawl_rule["output"]``（``table``、可选的
+    ``db_uri`` 与 ``conflict``）批量 upsert 到数据中心表。
+
+    处理函数发现的新链接可放入 :attr:`frontier`，同一 ``source_platform`` 抓取成功的
+    URL 会跨任务去重。
+    """
+
+    worker: "CrawlWorker"
+    run: TaskRun
+    crawl_rule: dict[str, Any]
+    stats: CrawlStats = field(default_factory=CrawlStats)
+    policy: HostPolicy = field(init=False)
+    pages: PageStore = field(default_factory=PageStore)
+    _frontier: URLFrontier | None = field(default=None, init=False, repr=False)
+    _writer: BatchWriter | None = field(default=None, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.policy = HostPolicy.from_rule(self.crawl_rule)
+
+    @property
+    def frontier(self) -> URLFrontier:
+        if self._frontier is None:
+            self._frontier = URLFrontier(seen_filter(self.run.source_platform))
+        return self._frontier
+
+    @property
+    def incremental(self) -> bool:
+        return bool(self.crawl_rule.get("incremental") or self.crawl_task.get("incremental"))
+
+    @property
+    def crawl_task(self) -> dict[str, Any]:
+        return self.run.crawl_task
+
+    async def fetch(self, url: str, method: str = "GET", **kwargs: Any) -> httpx.Response:
+        return await self.worker.fetch(self, url, method, **kwargs)
+
+    async def write(self, record: dict[str, Any]) -> None:
+        if self._writer is None:
+            output = self.crawl_rule.get("output") or {}
+            if not output.get("table"):
+                raise ValueError("crawl_rule 中没有配置输出数据表")
+            writer = BatchWriter(output["table"], db_uri=output.get("db_uri"), conflict_columns=output.get("conflict"))
+            self._writer = await writer.__aenter__()
+        await self._writer.add(record)
+
+    async def close_writer(self) -> None:
+        if self._writer is not None:
+            try:
+                await self._writer.close()
+            finally:
+                self.stats.rows = self._writer.written
+
+    def changed(self, url: str, response: httpx.Response) -> bool:
+        """页面相对上次抓取是否有变化；未启用增量抓取时始终为 True。"""
+        if not self.incremental:
+            return True
+        changed = self.pages.changed(url, response)
+        if not changed:
+            self.stats.unchanged += 1
+        return changed
+
+
+Handler = Callable[[CrawlContext], Awaitable[None]]
+
+# 抓取处理函数注册表，按 crawl_rule["handler"] 或 source_platform 查找
+handlers: dict[str, Handler] = {}
+
+
+def register_handler(name: str) -> Callable[[Handler], Handler]:
+    """注册抓取处理函数。
+
+    Example:
+        >>> @register_handler("weibo")
+        ... async def crawl_weibo(ctx: CrawlContext) -> None:
+        ...     response = await ctx.fetch(ctx.crawl_task["url"])
+    """
+
+    def decorator(handler: Handler) -> Handler:
+        handlers[name] = handler
+        return handler
+
+    return decorator
+
+
+@register_handler("default")
+async def fetch_urls(ctx: CrawlContext) -> None:
+    """默认处理函数：并发抓取 crawl_task 中的 ``url`` / ``urls``，全部失败时报错。"""
+    urls = ctx.crawl_task.get("urls") or []
+    if isinstance(urls, str):
+        urls = [urls]
+    if ctx.crawl_task.get("url"):
+        urls = [ctx.crawl_task["url"], *urls]
+    if not urls:
+        raise ValueError("crawl_task 中没有可抓取的 url")
+    if ctx.incremental:
+        await ctx.pages.preload(urls)
+
+    async def fetch_one(url: str) -> None:
+        response = await ctx.fetch(url)
+        if not ctx.changed(url, response):
+            return
+        response.raise_for_status()
+
+    results = await asyncio.gather(*(fetch_one(url) for url in urls), return_exceptions=True)
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if len(failures) == len(urls):
+        raise failures[0]
+
+
+class CrawlWorker:
+    """基于 asyncio 的抓取执行器，可直接作为 ``TaskScheduler`` 的 dispatch。
+
+    所有任务共用一个 ``httpx.AsyncClient``。同时进行的请求数受 ``max_concurrency``
+    限制，每个 ``source_platform`` 另受 ``crawl_rule["concurrency"]``（缺省为
+    ``platform_concurrency``）限制。
+
+    任务被停止（KILL）后，正在执行的协程会被取消，进行中的请求随之中断。
+    执行期间每 ``lease / 4`` 秒刷新 TaskRun 的 ``heartbeat_at``，进程退出后
+    调度器会在租约过期时重新认领该任务。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.CRAWL_MAX_CONCURRENCY,
+        platform_concurrency: int = settings.CRAWL_PLATFORM_CONCURRENCY,
+        timeout: float = settings.CRAWL_TIMEOUT,
+        lease: float = settings.SCHEDULER_RUN_LEASE,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.platform_concurrency = platform_concurrency
+        self.timeout = timeout
+        self.lease = lease
+        self.client: httpx.AsyncClient | None = None
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._platform_limits: dict[str, asyncio.Semaphore] = {}
+        self.cancellation = CancellationWatcher()
+
+    async def __aenter__(self) -> "CrawlWorker":
+        await self.cancellation.start()
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={"User-Agent": settings.CRAWL_USER_AGENT},
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.cancellation.stop()
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def platform_limit(self, source_platform: str, crawl_rule: dict[str, Any]) -> asyncio.Semaphore:
+        limit = self._platform_limits.get(source_platform)
+        if limit is None:
+            limit = asyncio.Semaphore(int(crawl_rule.get("concurrency") or self.platform_concurrency))
+            self._platform_limits[source_platform] = limit
+        return limit
+
+    async def fetch(self, ctx: CrawlContext, url: str, method: str = "GET", **kwargs: Any) -> httpx.Response:
+        if self.client is None:
+            raise RuntimeError("CrawlWorker is not started")
+        if ctx.incremental and method.upper() == "GET":
+            kwargs["headers"] = {**await ctx.pages.conditional_headers(url), **(kwargs.get("headers") or {})}
+        # 先等站点限速再占并发名额，避免等待中的请求占满并发上限
+        delay = await host_limiter.reserve(url, ctx.policy)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        async with self.platform_limit(ctx.run.source_platform, ctx.crawl_rule), self._global_limit:
+            started = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                ctx.stats.errors += 1
+                await host_limiter.record(url, ctx.policy, None, time.perf_counter() - started)
+                raise
+        latency = time.perf_counter() - started
+        await host_limiter.record(url, ctx.policy, response, latency)
+        ctx.stats.record_latency(latency)
+        ctx.stats.pages += 1
+        ctx.stats.bytes += len(response.content)
+        if response.is_error:
+            ctx.stats.errors += 1
+        elif ctx._frontier is not None and method.upper() == "GET":
+            ctx._frontier.done(url)
+        return response
+
+    async def load_rule(self, source_platform: str) -> dict[str, Any]:
+        async with AsyncSession(async_engine) as session:
+            statement = select(Rule.crawl_rule).where(Rule.source_platform == source_platform)
+            crawl_rule = (await session.exec(statement)).first()
+        if crawl_rule is None:
+            raise ValueError(f"抓取规则不存在: {source_platform}")
+        return crawl_rule
+
+    @staticmethod
+    def resolve_handler(run: TaskRun, crawl_rule: dict[str, Any]) -> Handler:
+        name = crawl_rule.get("handler")
+        if name is None:
+            return handlers.get(run.source_platform, handlers["default"])
+        if name not in handlers:
+            raise ValueError(f"未注册的抓取处理函数: {name}")
+        return handlers[name]
+
+    async def set_status(self, run: TaskRun, status: TaskStatus, error_reason: str | None = None) -> None:
+        """同时更新 TaskRun 与 Task 的状态；已被停止（KILL）的任务不会被覆盖。"""
+        now = datetime.now(UTC)
+        values: dict[str, Any] = {"status": status.value, "error_reason": error_reason}
+        if status == TaskStatus.IN_PROGRESS:
+            values["started_at"] = now
+            values["heartbeat_at"] = now
+        else:
+            values["finished_at"] = now
+            values["heartbeat_at"] = None
+        async with AsyncSession(async_engine) as session:
+            await session.execute(
+                update(TaskRun)
+                .where(col(TaskRun.id) == run.id, col(TaskRun.status) != TaskStatus.KILL.value)
+                .values(**values)
+            )
+            await session.execute(
+                update(Task)
+                .where(
+                    col(Task.task_fingerprint) == run.task_fingerprint,
+                    col(Task.status) != TaskStatus.KILL.value,
+                )
+                .values(status=status.value, updated_at=now)
+            )
+            await session.commit()
+        run.status = status.value
+        run.error_reason = error_reason
+
+    async def heartbeat(self, run: TaskRun) -> None:
+        """定期刷新执行中任务的 ``heartbeat_at``，失败时记录日志并在下个周期重试。"""
+        while True:
+            await asyncio.sleep(self.lease / 4)
+            try:
+                async with AsyncSession(async_engine) as session:
+                    await session.execute(
+                        update(TaskRun)
+                        .where(col(TaskRun.id) == run.id, col(TaskRun.status) == TaskStatus.IN_PROGRESS.value)
+                        .values(heartbeat_at=datetime.now(UTC))
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Refreshing heartbeat of task run %s failed", run.id)
+
+    async def record_history(
+        self,
+        run: TaskRun,
+        stats: CrawlStats,
+        status: TaskStatus,
+        error_reason: str | None,
+        started_at: datetime,
+        duration: float,
+    ) -> None:
+        history = TaskRunHistory(
+            task_run_id=run.id,
+            task_fingerprint=run.task_fingerprint,
+            source_platform=run.source_platform,
+            status=status.value,
+            error_reason=error_reason,
+            started_at=started_at,
+            finished_at=datetime.now(UTC),
+            duration=duration,
+            pages=stats.pages,
+            bytes=stats.bytes,
+            rows=stats.rows,
+            errors=stats.errors,
+            unchanged=stats.unchanged,
+            latency_p50=stats.percentile(50),
+            latency_p95=stats.percentile(95),
+            throughput=stats.pages / duration if duration > 0 else 0,
+        )
+        try:
+            async with AsyncSession(async_engine) as session:
+                session.add(history)
+                await session.commit()
+        except Exception:
+            logger.exception("Recording history of task run %s failed", run.id)
+
+    async def execute(self, run: TaskRun) -> CrawlStats:
+        """执行一次 TaskRun：IN_PROGRESS → COMPLETED / FAILED，并追加一条运行记录。"""
+        # 调度器认领时已将 TaskRun 置为 IN_PROGRESS，这里同时同步 Task 的状态
+        await self.set_status(run, TaskStatus.IN_PROGRESS)
+        started_at, started = datetime.now(UTC), time.perf_counter()
+        heartbeat = asyncio.create_task(self.heartbeat(run))
+
+        ctx: CrawlContext | None = None
+        current = asyncio.current_task()
+        assert current is not None
+        self.cancellation.register(run.task_fingerprint, current)
+        error_reason: str | None = None
+        try:
+            crawl_rule = await self.load_rule(run.source_platform)
+            ctx = CrawlContext(worker=self, run=run, crawl_rule=crawl_rule)
+            await self.resolve_handler(run, crawl_rule)(ctx)
+            await ctx.close_writer()
+            # 任务成功后才保存页面指纹，失败的任务下次会重新完整抓取
+            if ctx.incremental:
+                await ctx.pages.flush()
+            if ctx._frontier is not None:
+                ctx._frontier.seen.flush()
+        except asyncio.CancelledError:
+            if not self.cancellation.killed(run.task_fingerprint):
+                raise
+            # 被 KILL 的任务：状态已由 stop_task 写入，放弃未写入的数据
+            current.uncancel()
+            logger.info("Task run %s was killed", run.id)
+            if ctx is not None and ctx._writer is not None:
+                ctx.stats.rows = ctx._writer.written
+                ctx._writer.abort()
+            status = TaskStatus.KILL
+        except Exception as e:
+            logger.warning("Task run %s failed: %r", run.id, e)
+            if ctx is not None:
+                # 已抓取到的记录仍然写入
+                try:
+                    await ctx.close_writer()
+                except Exception:
+                    logger.exception("Flushing rows of task run %s failed", run.id)
+            status, error_reason = TaskStatus.FAILED, f"{type(e).__name__}: {e}"
+            await self.set_status(run, status, error_reason=error_reason)
+        else:
+            self.cancellation.unregister(run.task_fingerprint)
+            status = TaskStatus.COMPLETED
+            await self.set_status(run, status)
+        finally:
+            heartbeat.cancel()
+            self.cancellation.unregister(run.task_fingerprint)
+
+        stats = ctx.stats if ctx else CrawlStats()
+        await self.record_history(run, stats, status, error_reason, started_at, time.perf_counter() - started)
+        return stats
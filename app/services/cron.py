@@ -0,0 +1,126 @@
+from datetime import UTC, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+# 预定义表达式
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {
+    name: index
+    for index, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1
+    )
+}
+DAY_NAMES = {name: index for index, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+# 最多向后搜索的年数，防止 "0 0 30 2 *" 这类永远不会触发的表达式死循环
+MAX_SEARCH_YEARS = 5
+
+
+class CronExpression:
+    """标准 5 段 CRON 表达式：分 时 日 月 周。
+
+    支持 ``*``、``a-b``、``*/n``、``a-b/n``、逗号列表、月份/星期英文缩写以及
+    ``@daily`` 等别名。日与周同时受限时，两者满足其一即可（与 crontab 一致）。
+
+    Example:
+        >>> CronExpression("*/15 9-18 * * mon-fri").next_after(datetime(2024, 1, 5, 18, 50))
+        datetime.datetime(2024, 1, 8, 9, 0)
+    """
+
+    def __init__(self, expr: str) -> None:
+        self.expr = expr
+        fields = ALIASES.get(expr.strip().lower(), expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: {expr!r}")
+        minute, hour, day, month, weekday = fields
+        self.minutes = self._parse(minute, 0, 59)
+        self.hours = self._parse(hour, 0, 23)
+        self.days = self._parse(day, 1, 31)
+        self.months = self._parse(month, 1, 12, MONTH_NAMES)
+        # 周日既可以写 0 也可以写 7
+        self.weekdays = {d % 7 for d in self._parse(weekday, 0, 7, DAY_NAMES)}
+        self.day_restricted = day != "*"
+        self.weekday_restricted = weekday != "*"
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int, names: dict[str, int] | None = None) -> set[int]:
+        def value(token: str) -> int:
+            token = token.lower()
+            if names and token in names:
+                return names[token]
+            number = int(token)
+            if not low <= number <= high:
+                raise ValueError(f"Cron value {number} out of range {low}-{high}")
+            return number
+
+        result: set[int] = set()
+        for part in field.split(","):
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: {step_str}")
+            else:
+                step = 1
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = value(start_str), value(end_str)
+            else:
+                start = value(part)
+                end = high if step > 1 else start
+            if start > end:
+                raise ValueError(f"Invalid cron range: {part}")
+            result.update(range(start, end + 1, step))
+        return result
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_days = dt.day in self.days
+        # datetime.weekday(): 周一为 0；cron 中周日为 0
+        in_weekdays = (dt.weekday() + 1) % 7 in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return in_days or in_weekdays
+        return in_days and in_weekdays
+
+    def next_after(self, dt: datetime) -> datetime:
+        """返回严格晚于 ``dt`` 的下一个触发时间（保留 ``dt`` 的时区信息）。
+
+        Raises:
+            ValueError: 在 MAX_SEARCH_YEARS 年内没有触发时间。
+        """
+        current = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt.year + MAX_SEARCH_YEARS
+        while current.year <= limit:
+            if current.month not in self.months:
+                # 跳到下个月 1 日 0 点
+                year, month = (current.year + 1, 1) if current.month == 12 else (current.year, current.month + 1)
+                current = current.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(current):
+                current = current.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if current.hour not in self.hours:
+                current = current.replace(minute=0) + timedelta(hours=1)
+                continue
+            if current.minute not in self.minutes:
+                current += timedelta(minutes=1)
+                continue
+            return current
+        raise ValueError(f"Cron expression {self.expr!r} never fires")
+
+
+def next_fire_time(cron_expr: str, after: datetime) -> datetime:
+    """按 SCHEDULER_TIMEZONE 解释 ``cron_expr``，返回 ``after`` 之后的下一次触发时间（UTC）。"""
+    timezone = ZoneInfo(settings.SCHEDULER_TIMEZONE)
+    return CronExpression(cron_expr).next_after(after.astimezone(timezone)).astimezone(UTC)
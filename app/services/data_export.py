@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import re
+import uuid
+from collections.abc import Iterator, Mapping
+from contextlib import nullcontext
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from urllib.parse import quote
+
+from sqlalchemy import Engine, Executable
+
+from app.core.config import settings
+from app.services import saved_query
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+_UNSAFE_FILENAME = re.compile(r'[^\x20-\x7e]|["\\]')
+
+
+def content_disposition(filename: str) -> str:
+    """下载文件名的 ``Content-Disposition`` 头。
+
+    响应头只能是 latin-1，中文文件名通过 ``filename*``（RFC 6266）传递，
+    ``filename`` 仅作为不支持该参数的客户端的 ASCII 回退。
+    """
+    # 非 ASCII、控制字符（CR/LF 等）以及引号、反斜杠替换为 "_"，避免破坏响应头
+    fallback = _UNSAFE_FILENAME.sub("_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime | date | time):
+        return value.isoformat()
+    if isinstance(value, Decimal | uuid.UUID):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def stream_rows(
+    engine: Engine,
+    statement: Executable,
+    params: Mapping[str, Any] | None = None,
+    timeout: float | None = None,
+) -> Iterator[Mapping]:
+    """使用服务端游标逐批读取查询结果，内存占用与结果集大小无关。
+
+    连接在生成器内部打开，迭代结束（或响应中断）时释放；给定 ``timeout`` 时
+    由数据库在超时后取消查询。
+    """
+    with engine.connect() as connection:
+        with saved_query.statement_timeout(connection, timeout) if timeout else nullcontext():
+            result = connection.execution_options(
+                stream_results=True, yield_per=settings.DATA_EXPORT_BATCH_SIZE
+            ).execute(statement, params)
+            yield from result.mappings()
+
+
+def iter_ndjson(rows: Iterator[Mapping]) -> Iterator[str]:
+    """将行序列化为 NDJSON，每 DATA_EXPORT_BATCH_SIZE 行输出一个数据块。"""
+    chunk: list[str] = []
+    for row in rows:
+        chunk.append(json.dumps(dict(row), ensure_ascii=False, default=_json_default))
+        if len(chunk) >= settings.DATA_EXPORT_BATCH_SIZE:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def iter_csv(rows: Iterator[Mapping]) -> Iterator[str]:
+    """将行序列化为带表头的 CSV，每 DATA_EXPORT_BATCH_SIZE 行输出一个数据块。"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    count = 0
+    for row in rows:
+        if count == 0:
+            writer.writerow(row.keys())
+        writer.writerow(_json_default(v) if isinstance(v, datetime | date | time) else v for v in row.values())
+        count += 1
+        if count % settings.DATA_EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_export(rows: Iterator[Mapping], export_format: str) -> Iterator[str]:
+    if export_format == "csv":
+        return iter_csv(rows)
+    return iter_ndjson(rows)
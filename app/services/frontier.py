@@ -0,0 +1,158 @@
+import hashlib
+import heapq
+import itertools
+import math
+import mmap
+import os
+import struct
+import threading
+from collections import deque
+
+import httpx
+
+from app.core.config import settings
+
+# 文件头：魔数、位数组长度 m、哈希函数个数 k
+_MAGIC = b"PYBLOOM1"
+_HEADER = struct.Struct("<8sQQ")
+
+
+class BloomFilter:
+    """布隆过滤器，用于记录抓取过的 URL。
+
+    按 ``capacity`` 与误判率 ``error_rate`` 计算位数组大小，例如一千万条、
+    千分之一误判率约占 18 MB。指定 ``path`` 时位数组直接映射到文件（mmap），
+    重启后按原大小重新映射即可继续使用，同一节点上的多个进程也可共享同一文件。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001, path: str | None = None) -> None:
+        self.path = path
+        if path and os.path.exists(path) and os.path.getsize(path) > _HEADER.size:
+            self._open(path)
+            return
+
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        length = _HEADER.size + (self.size + 7) // 8
+        header = _HEADER.pack(_MAGIC, self.size, self.hashes)
+        if path is None:
+            self._buffer: mmap.mmap | bytearray = bytearray(length)
+            self._buffer[: _HEADER.size] = header
+        else:
+            with open(path, "wb") as f:
+                f.write(header)
+                f.truncate(length)
+            self._open(path)
+
+    def _open(self, path: str) -> None:
+        with open(path, "r+b") as f:
+            self._buffer = mmap.mmap(f.fileno(), 0)
+        magic, self.size, self.hashes = _HEADER.unpack_from(self._buffer, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a bloom filter file: {path}")
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item: str) -> bool:
+        buffer = self._buffer
+        return all(buffer[_HEADER.size + p // 8] & (1 << (p % 8)) for p in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """加入 ``item``，返回它此前是否不在过滤器中。"""
+        added = False
+        buffer = self._buffer
+        for p in self._positions(item):
+            index, bit = _HEADER.size + p // 8, 1 << (p % 8)
+            if not buffer[index] & bit:
+                buffer[index] |= bit
+                added = True
+        return added
+
+    def flush(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.flush()
+            self._buffer.close()
+
+
+class URLFrontier:
+    """待抓取 URL 队列：按站点分别维护优先级队列，出队时在站点间轮转。
+
+    已抓取过的 URL（由 ``seen`` 判断）以及本次任务已入队的 URL 不会重复入队；
+    同一站点内优先级高的先出队，优先级相同时先进先出。由 :meth:`pop` 取出的 URL
+    在抓取成功后才由 :meth:`done` 加入 ``seen``，任务失败或被停止时仍在队列中的
+    URL 下次会重新抓取；未经队列直接抓取的 URL（如种子页、列表页）不会被标记。
+    """
+
+    def __init__(self, seen: BloomFilter) -> None:
+        self.seen = seen
+        self._queued: set[str] = set()
+        self._popped: set[str] = set()
+        self._queues: dict[str, list[tuple[int, int, str]]] = {}
+        self._hosts: deque[str] = deque()
+        self._counter = itertools.count()
+        self._length = 0
+
+    def push(self, url: str, priority: int = 0) -> bool:
+        """URL 入队，已抓取过或已在本次任务中入队时返回 False。"""
+        if url in self._queued or url in self.seen:
+            return False
+        self._queued.add(url)
+        host = httpx.URL(url).host
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = []
+            self._hosts.append(host)
+        heapq.heappush(queue, (-priority, next(self._counter), url))
+        self._length += 1
+        return True
+
+    def done(self, url: str) -> None:
+        """标记由 :meth:`pop` 取出的 URL 已抓取成功，之后的任务不再抓取；其他 URL 忽略。"""
+        if url in self._popped:
+            self._popped.discard(url)
+            self.seen.add(url)
+
+    def pop(self) -> str | None:
+        if not self._hosts:
+            return None
+        host = self._hosts.popleft()
+        queue = self._queues[host]
+        _, _, url = heapq.heappop(queue)
+        if queue:
+            self._hosts.append(host)
+        else:
+            del self._queues[host]
+        self._length -= 1
+        self._popped.add(url)
+        return url
+
+    def __len__(self) -> int:
+        return self._length
+
+
+_seen_filters: dict[str, BloomFilter] = {}
+_seen_lock = threading.Lock()
+
+
+def seen_filter(name: str) -> BloomFilter:
+    """返回名为 ``name``（通常是 source_platform）的进程内共享过滤器。
+
+    设置了 ``CRAWL_FRONTIER_DIR`` 时过滤器映射到该目录下以名称 MD5 命名的 ``.bloom`` 文件。
+    """
+    with _seen_lock:
+        bloom = _seen_filters.get(name)
+        if bloom is None:
+            path = None
+            if settings.CRAWL_FRONTIER_DIR:
+                os.makedirs(settings.CRAWL_FRONTIER_DIR, exist_ok=True)
+                path = os.path.join(settings.CRAWL_FRONTIER_DIR, f"{hashlib.md5(name.encode()).hexdigest()}.bloom")
+            bloom = BloomFilter(settings.CRAWL_SEEN_CAPACITY, settings.CRAWL_SEEN_ERROR_RATE, path)
+            _seen_filters[name] = bloom
+        return bloom
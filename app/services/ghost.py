@@ -0,0 +1,72 @@
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+
+class GhostError(Exception):
+    """Ghost 服务返回错误或无法连接。"""
+
+
+class GhostClient:
+    """Ghost 推送服务的共享客户端。
+
+    由应用 lifespan 启动与关闭，所有请求复用同一个带 keep-alive 连接池的
+    ``httpx.AsyncClient``，避免每次推送都重新建立连接。
+    """
+
+    def __init__(
+        self,
+        url: str = settings.GHOST_API_URL,
+        timeout: float = settings.GHOST_TIMEOUT,
+        max_connections: int = settings.GHOST_MAX_CONNECTIONS,
+    ) -> None:
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # lifespan 之外（脚本、测试）使用时按需创建
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections, max_keepalive_connections=self.max_connections
+                ),
+            )
+        return self._client
+
+    async def start(self) -> None:
+        _ = self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def send(self, table_name: str, record_id: int, is_alpha: bool) -> None:
+        """推送一条记录。
+
+        Raises:
+            GhostError: Ghost 服务返回非 200 或无法连接。
+        """
+        payload = {"table_name": table_name, "record_id": record_id, "is_alpha": is_alpha}
+        try:
+            response = await self.client.post(self.url, json=payload)
+        except httpx.RequestError as e:
+            raise GhostError("无法连接到 Ghost 服务") from e
+        if response.status_code != 200:
+            raise GhostError(f"Ghost 服务返回错误: {response.text}")
+
+    async def __aenter__(self) -> "GhostClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+ghost_client = GhostClient()
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlmodel import col, or_, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models.data_model import GhostJob
+from app.models.task_model import TaskStatus
+from app.services.ghost import GhostClient, GhostError, ghost_client
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue(
+    session: AsyncSession, table_name: str, record_ids: list[int], is_alpha: bool, user_id: uuid.UUID
+) -> GhostJob:
+    """创建推送任务并立即返回，由 :class:`GhostDispatcher` 在后台执行。"""
+    record_ids = list(dict.fromkeys(record_ids))
+    job = GhostJob(
+        table_name=table_name,
+        is_alpha=is_alpha,
+        record_ids=record_ids,
+        remaining_ids=record_ids,
+        total=len(record_ids),
+        status=TaskStatus.PENDING.value,
+        user_id=user_id,
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    ghost_dispatcher.wake()
+    return job
+
+
+class GhostDispatcher:
+    """在后台执行 Ghost 推送任务（ghost_job 表）。
+
+    每个 API 进程各运行一个，以 ``FOR UPDATE SKIP LOCKED`` 认领待执行的任务，
+    同一任务不会被重复认领。单条记录推送失败时按指数退避重试
+    ``GHOST_RETRY_ATTEMPTS`` 次；进度随每条记录写回数据库。执行中的任务会定期
+    刷新 ``updated_at``，超过 ``GHOST_JOB_LEASE`` 秒未刷新（进程退出）的任务会被
+    重新认领，并只推送尚未完成的记录。
+    """
+
+    def __init__(
+        self,
+        client: GhostClient,
+        poll_interval: float = settings.GHOST_DISPATCH_INTERVAL,
+        max_jobs: int = settings.GHOST_DISPATCH_JOBS,
+        concurrency: int = settings.GHOST_BULK_CONCURRENCY,
+        lease: float = settings.GHOST_JOB_LEASE,
+    ) -> None:
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_jobs = max_jobs
+        self.concurrency = concurrency
+        self.lease = lease
+        self._wakeup: asyncio.Event | None = None
+        self._loop_task: asyncio.Task | None = None
+        self._jobs: set[asyncio.Task] = set()
+
+    def wake(self) -> None:
+        """有新任务时立即认领，而不是等到下一次轮询。"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._loop_task, *self._jobs] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop_task = None
+        self._wakeup = None
+
+    async def __aenter__(self) -> "GhostDispatcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                for job in await self.claim(self.max_jobs - len(self._jobs)):
+                    task = asyncio.create_task(self.process(job))
+                    self._jobs.add(task)
+                    task.add_done_callback(self._jobs.discard)
+            except Exception:
+                logger.exception("Claiming ghost jobs failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def claim(self, limit: int) -> list[GhostJob]:
+        if limit <= 0:
+            return []
+        now = datetime.now(UTC)
+        statement = (
+            select(GhostJob)
+            .where(
+                or_(
+                    GhostJob.status == TaskStatus.PENDING.value,
+                    (GhostJob.status == TaskStatus.IN_PROGRESS.value)
+                    & (col(GhostJob.updated_at) < now - timedelta(seconds=self.lease)),
+                )
+            )
+            .order_by(col(GhostJob.created_at))
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            jobs = (await session.exec(statement)).all()
+            for job in jobs:
+                job.status = TaskStatus.IN_PROGRESS.value
+                job.attempts += 1
+                job.updated_at = now
+                session.add(job)
+            await session.commit()
+        return list(jobs)
+
+    async def _send(self, job: GhostJob, record_id: int) -> None:
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(settings.GHOST_RETRY_ATTEMPTS),
+            wait=wait_exponential(multiplier=1, max=settings.GHOST_RETRY_MAX_WAIT),
+            retry=retry_if_exception_type(GhostError),
+            reraise=True,
+        ):
+            with attempt:
+                await self.client.send(job.table_name, record_id, job.is_alpha)
+
+    async def _save(self, job: GhostJob, **values: Any) -> None:
+        async with AsyncSession(async_engine) as session:
+            await session.execute(
+                update(GhostJob)
+                .where(col(GhostJob.id) == job.id)
+                .values(
+                    remaining_ids=list(job.remaining_ids),
+                    errors=dict(job.errors),
+                    succeeded=job.succeeded,
+                    failed=job.failed,
+                    updated_at=datetime.now(UTC),
+                    **values,
+                )
+            )
+            await session.commit()
+
+    async def _heartbeat(self, job: GhostJob, save_lock: asyncio.Lock) -> None:
+        while True:
+            await asyncio.sleep(self.lease / 4)
+            try:
+                async with save_lock:
+                    await self._save(job)
+            except Exception:
+                # 下个周期重试；租约过期前恢复即可避免任务被重复认领
+                logger.exception("Refreshing lease of ghost job %s failed", job.id)
+
+    async def process(self, job: GhostJob) -> None:
+        limit = asyncio.Semaphore(self.concurrency)
+        save_lock = asyncio.Lock()
+        remaining = list(job.remaining_ids)
+        job.errors = dict(job.errors)
+
+        async def send_one(record_id: int) -> None:
+            async with limit:
+                try:
+                    await self._send(job, record_id)
+                except GhostError as e:
+                    job.failed += 1
+                    job.errors[str(record_id)] = str(e)
+                else:
+                    job.succeeded += 1
+            async with save_lock:
+                remaining.remove(record_id)
+                job.remaining_ids = list(remaining)
+                await self._save(job)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job, save_lock))
+        try:
+            # 任一推送或进度保存失败时取消其余推送，避免心跳停止后仍在推送
+            async with asyncio.TaskGroup() as group:
+                for record_id in list(remaining):
+                    group.create_task(send_one(record_id))
+        except Exception:
+            logger.exception("Ghost job %s failed", job.id)
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        if remaining:
+            # 异常中断，留待租约过期后重新认领
+            return
+        status = TaskStatus.COMPLETED if job.failed == 0 else TaskStatus.FAILED
+        async with save_lock:
+            await self._save(job, status=status.value, finished_at=datetime.now(UTC))
+
+
+ghost_dispatcher = GhostDispatcher(ghost_client)
@@ -0,0 +1,92 @@
+import hashlib
+from datetime import UTC, datetime
+
+import httpx
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import async_engine
+from app.models.spider_model import PageFingerprint
+from app.utils import SecureUtil
+
+# 每条 SELECT ... IN 查询的最大 URL 数
+LOAD_CHUNK_SIZE = 1000
+
+
+class PageStore:
+    """增量抓取使用的页面指纹（ETag、Last-Modified、内容 MD5）。
+
+    一次 TaskRun 内先批量读取已知指纹，抓取时据此发出条件请求并判断内容是否变化，
+    新指纹暂存在内存中，任务成功后由 :meth:`flush` 一次写回。
+    """
+
+    def __init__(self) -> None:
+        # 值为 None 表示数据库中没有该 URL 的记录
+        self._known: dict[str, PageFingerprint | None] = {}
+        self._dirty: dict[str, dict[str, str | None]] = {}
+
+    async def preload(self, urls: list[str]) -> None:
+        keys = list({SecureUtil.md5(url) for url in urls} - self._known.keys())
+        if not keys:
+            return
+        async with AsyncSession(async_engine) as session:
+            for start in range(0, len(keys), LOAD_CHUNK_SIZE):
+                chunk = keys[start : start + LOAD_CHUNK_SIZE]
+                statement = select(PageFingerprint).where(col(PageFingerprint.url_fingerprint).in_(chunk))
+                found = {page.url_fingerprint: page for page in (await session.exec(statement)).all()}
+                for key in chunk:
+                    self._known[key] = found.get(key)
+
+    async def conditional_headers(self, url: str) -> dict[str, str]:
+        key = SecureUtil.md5(url)
+        if key not in self._known:
+            await self.preload([url])
+        page = self._known[key]
+        headers: dict[str, str] = {}
+        if page is not None:
+            if page.etag:
+                headers["If-None-Match"] = page.etag
+            if page.last_modified:
+                headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    def changed(self, url: str, response: httpx.Response) -> bool:
+        """判断页面相对上次抓取是否有变化，并记录新的指纹。"""
+        if response.status_code == 304:
+            return False
+        if not response.is_success:
+            return True
+
+        key = SecureUtil.md5(url)
+        page = self._known.get(key)
+        fingerprint = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": hashlib.md5(response.content).hexdigest(),
+        }
+        if page is None or any(getattr(page, k) != v for k, v in fingerprint.items()):
+            self._dirty[key] = fingerprint
+        return page is None or page.content_hash != fingerprint["content_hash"]
+
+    async def flush(self) -> int:
+        """写回本次抓取产生的新指纹，返回写入条数。"""
+        if not self._dirty:
+            return 0
+        now = datetime.now(UTC)
+        rows = [{"url_fingerprint": key, **values, "updated_at": now} for key, values in self._dirty.items()]
+        statement = insert(PageFingerprint)
+        statement = statement.on_conflict_do_update(
+            index_elements=[PageFingerprint.url_fingerprint],
+            set_={
+                "etag": statement.excluded.etag,
+                "last_modified": statement.excluded.last_modified,
+                "content_hash": statement.excluded.content_hash,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        async with AsyncSession(async_engine) as session:
+            await session.execute(statement, rows)
+            await session.commit()
+        self._dirty.clear()
+        return len(rows)
@@ -0,0 +1,157 @@
+import asyncio
+import dataclasses
+import fcntl
+import os
+import struct
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+from urllib.parse import quote
+
+import httpx
+
+from app.core.config import settings
+from app.core.rate_limit import TokenBucket
+
+T = TypeVar("T")
+
+# 共享状态文件格式：rate, tokens, updated_at（time.monotonic，Linux 下同一节点的进程共用时钟）
+_STATE = struct.Struct("ddd")
+
+
+@dataclass
+class HostPolicy:
+    """单个站点的限速策略，来自 ``Rule.crawl_rule["rate_limit"]``。
+
+    速率按 AIMD 调整：响应正常时每次增加 ``increase`` 个/秒，遇到 429、5xx、
+    网络错误或响应时间超过 ``latency_threshold`` 秒时乘以 ``decrease``。
+    """
+
+    rate: float = settings.CRAWL_HOST_RATE
+    burst: float = settings.CRAWL_HOST_BURST
+    min_rate: float = settings.CRAWL_HOST_MIN_RATE
+    max_rate: float = settings.CRAWL_HOST_MAX_RATE
+    increase: float = 0.1
+    decrease: float = 0.5
+    latency_threshold: float = 5.0
+
+    @classmethod
+    def from_rule(cls, crawl_rule: dict[str, Any]) -> "HostPolicy":
+        config = crawl_rule.get("rate_limit") or {}
+        names = {f.name for f in dataclasses.fields(cls)}
+        return cls(**{k: float(v) for k, v in config.items() if k in names})
+
+
+class LocalBudgetStore:
+    """进程内的站点令牌桶。"""
+
+    # 读写不涉及 I/O，可以直接在事件循环中执行
+    blocking = False
+
+    def __init__(self) -> None:
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def bucket(self, host: str, policy: HostPolicy) -> Iterator[TokenBucket]:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(policy.rate, policy.burst)
+            yield bucket
+
+
+class FileBudgetStore:
+    """以文件保存站点令牌桶，同一节点上的多个抓取进程共享同一份限速额度。
+
+    每个站点一个 24 字节的状态文件，读写时以 ``flock`` 加排他锁。等待其他进程
+    释放锁会阻塞当前线程，因此由 :class:`AdaptiveRateLimiter` 放到线程中执行。
+    """
+
+    blocking = True
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def bucket(self, host: str, policy: HostPolicy) -> Iterator[TokenBucket]:
+        path = os.path.join(self.directory, quote(host, safe=""))
+        with self._lock, open(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), "r+b") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                bucket = TokenBucket(policy.rate, policy.burst)
+                data = f.read(_STATE.size)
+                if len(data) == _STATE.size:
+                    bucket.rate, bucket.tokens, bucket.updated_at = _STATE.unpack(data)
+                yield bucket
+                f.seek(0)
+                f.write(_STATE.pack(bucket.rate, bucket.tokens, bucket.updated_at))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class AdaptiveRateLimiter:
+    """按站点限速，并根据响应情况自适应调整速率。"""
+
+    def __init__(self, store: LocalBudgetStore | FileBudgetStore) -> None:
+        self.store = store
+
+    @staticmethod
+    def host(url: str | httpx.URL) -> str:
+        return httpx.URL(url).host
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+    async def reserve(self, url: str | httpx.URL, policy: HostPolicy) -> float:
+        """预订一次请求额度，返回发出请求前需要等待的秒数。"""
+        return await self._run(self._reserve, self.host(url), policy)
+
+    async def record(
+        self,
+        url: str | httpx.URL,
+        policy: HostPolicy,
+        response: httpx.Response | None,
+        latency: float,
+    ) -> None:
+        """根据一次请求的结果调整站点速率；``response`` 为 None 表示网络错误。"""
+        await self._run(self._record, self.host(url), policy, response, latency)
+
+    def _reserve(self, host: str, policy: HostPolicy) -> float:
+        with self.store.bucket(host, policy) as bucket:
+            bucket.capacity = policy.burst
+            return bucket.reserve()
+
+    def _record(self, host: str, policy: HostPolicy, response: httpx.Response | None, latency: float) -> None:
+        throttled = response is None or response.status_code == 429 or response.status_code >= 500
+        with self.store.bucket(host, policy) as bucket:
+            if throttled or latency > policy.latency_threshold:
+                bucket.rate = max(policy.min_rate, bucket.rate * policy.decrease)
+            else:
+                bucket.rate = min(policy.max_rate, bucket.rate + policy.increase)
+
+            retry_after = _retry_after(response)
+            if retry_after:
+                # 按对方要求暂停：把令牌透支到 retry_after 秒后才能恢复
+                bucket.tokens = min(bucket.tokens, -retry_after * bucket.rate)
+
+
+def _retry_after(response: httpx.Response | None) -> float | None:
+    if response is None or response.status_code not in (429, 503):
+        return None
+    try:
+        return max(float(response.headers.get("Retry-After", "")), 0.0)
+    except ValueError:
+        return None
+
+
+host_limiter = AdaptiveRateLimiter(
+    FileBudgetStore(settings.CRAWL_RATE_STATE_DIR) if settings.CRAWL_RATE_STATE_DIR else LocalBudgetStore()
+)
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Connection, TextClause, text
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.data_model import DataQuery
+
+try:
+    import redis
+except ImportError:  # redis 为可选依赖，仅共享缓存需要
+    redis = None
+
+# 缓存键: (SQL ID, 数据查询配置 ID, 结果版本, skip, limit)
+PageKey = tuple[uuid.UUID, uuid.UUID, str, int, int]
+
+
+def normalize_sql(sql: str) -> str:
+    """去掉首尾空白和结尾分号，使保存的 SQL 可以作为子查询嵌套。"""
+    return sql.strip().rstrip(";").strip()
+
+
+def paginate(sql: str) -> TextClause:
+    """将保存的 SQL 包装为带 LIMIT/OFFSET 的外层查询，参数为 ``:limit`` 和 ``:skip``。"""
+    return text(f"SELECT * FROM ({normalize_sql(sql)}) AS saved_query LIMIT :limit OFFSET :skip")
+
+
+def capped_count(sql: str) -> TextClause:
+    """统计保存的 SQL 的结果行数，最多数到 ``:cap`` 行为止。"""
+    return text(f"SELECT count(*) FROM (SELECT 1 FROM ({normalize_sql(sql)}) AS saved_query LIMIT :cap) AS capped")
+
+
+@contextmanager
+def statement_timeout(connection: Connection, seconds: float) -> Iterator[None]:
+    """在 ``connection`` 上为接下来的语句设置执行超时，超时后由数据库取消查询。
+
+    PostgreSQL 使用 ``SET LOCAL statement_timeout``，随事务结束自动失效；
+    MySQL 使用会话级 ``MAX_EXECUTION_TIME``（仅对 SELECT 生效），退出时恢复为原值，
+    避免影响连接池中复用的连接。其他方言不做限制。
+    """
+    milliseconds = int(seconds * 1000)
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        connection.execute(text(f"SET LOCAL statement_timeout = {milliseconds}"))
+        yield
+    elif dialect in ("mysql", "mariadb"):
+        previous = connection.execute(text("SELECT @@SESSION.MAX_EXECUTION_TIME")).scalar_one()
+        connection.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {milliseconds}"))
+        try:
+            yield
+        finally:
+            connection.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(previous)}"))
+    else:
+        yield
+
+
+def result_version(data_query: DataQuery, db_uri: str) -> str:
+    """查询结果版本。
+
+    SQL、目标库连接、缓存时间或 ``updated_at`` 任一变化（包括直接修改数据库）后
+    版本随之变化，旧的缓存结果不再命中。
+    """
+    updated_at = data_query.updated_at.isoformat() if data_query.updated_at else ""
+    parts = (data_query.sql, db_uri, updated_at, str(cache_ttl(data_query)))
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+@dataclass
+class CachedPage:
+    rows: list[dict[str, Any]]
+    count: int
+    cached_at: float
+
+    @property
+    def age(self) -> int:
+        return max(int(time.time() - self.cached_at), 0)
+
+
+class ResultCacheBackend(Protocol):
+    """查询结果缓存后端。"""
+
+    def get(self, key: PageKey) -> CachedPage | None: ...
+
+    def set(self, key: PageKey, page: CachedPage, ttl: int) -> None: ...
+
+    def invalidate(self, sql_id: uuid.UUID | None = None) -> int: ...
+
+
+class MemoryResultCache:
+    """进程内 LRU 缓存，最多保存 DATA_QUERY_CACHE_SIZE 页。"""
+
+    def __init__(self, maxsize: int = settings.DATA_QUERY_CACHE_SIZE) -> None:
+        self._cache = TTLCache(ttl=settings.DATA_QUERY_CACHE_TTL, maxsize=maxsize)
+
+    def get(self, key: PageKey) -> CachedPage | None:
+        return self._cache.get(key)
+
+    def set(self, key: PageKey, page: CachedPage, ttl: int) -> None:
+        self._cache.set(key, page, ttl=ttl)
+
+    def invalidate(self, sql_id: uuid.UUID | None = None) -> int:
+        return self._cache.invalidate(lambda key: sql_id is None or key[0] == sql_id)  # type: ignore[index]
+
+
+class RedisResultCache:
+    """Redis 共享缓存，多个 API 进程共用同一份查询结果。结果以 JSON 保存。"""
+
+    prefix = "saved_query"
+
+    def __init__(self, url: str) -> None:
+        if redis is None:
+            raise RuntimeError("DATA_QUERY_CACHE_REDIS_URL 已配置，但未安装 redis")
+        self.client = redis.Redis.from_url(url)
+
+    def _key(self, key: PageKey) -> str:
+        sql_id, config_id, version, skip, limit = key
+        return f"{self.prefix}:{sql_id}:{config_id}:{version}:{skip}:{limit}"
+
+    def get(self, key: PageKey) -> CachedPage | None:
+        value = self.client.get(self._key(key))
+        if value is None:
+            return None
+        return CachedPage(**json.loads(value))
+
+    def set(self, key: PageKey, page: CachedPage, ttl: int) -> None:
+        value = json.dumps(jsonable_encoder(page), ensure_ascii=False)
+        self.client.set(self._key(key), value, ex=ttl)
+
+    def invalidate(self, sql_id: uuid.UUID | None = None) -> int:
+        pattern = f"{self.prefix}:{sql_id if sql_id is not None else '*'}:*"
+        keys = list(self.client.scan_iter(match=pattern, count=1000))
+        return self.client.delete(*keys) if keys else 0
+
+
+_backend: ResultCacheBackend = (
+    RedisResultCache(settings.DATA_QUERY_CACHE_REDIS_URL)
+    if settings.DATA_QUERY_CACHE_REDIS_URL
+    else MemoryResultCache()
+)
+
+
+def set_backend(backend: ResultCacheBackend) -> None:
+    """替换查询结果缓存后端。"""
+    global _backend
+    _backend = backend
+
+
+def cache_ttl(data_query: DataQuery) -> int:
+    """查询结果缓存时间：``DataQuery.cache_ttl``，未设置时为 DATA_QUERY_CACHE_TTL。"""
+    return settings.DATA_QUERY_CACHE_TTL if data_query.cache_ttl is None else data_query.cache_ttl
+
+
+def page_key(data_query: DataQuery, db_uri: str, skip: int, limit: int) -> PageKey:
+    return data_query.id, data_query.config_id, result_version(data_query, db_uri), skip, limit
+
+
+def get_cached_page(data_query: DataQuery, db_uri: str, skip: int, limit: int) -> CachedPage | None:
+    """返回缓存的查询结果页，``db_uri`` 为查询实际执行的数据中心连接。"""
+    return _backend.get(page_key(data_query, db_uri, skip, limit))
+
+
+def cache_page(
+    data_query: DataQuery, db_uri: str, skip: int, limit: int, rows: list[dict[str, Any]], count: int
+) -> CachedPage:
+    page = CachedPage(rows=rows, count=count, cached_at=time.time())
+    ttl = cache_ttl(data_query)
+    if ttl > 0:
+        _backend.set(page_key(data_query, db_uri, skip, limit), page, ttl)
+    return page
+
+
+def invalidate_results(sql_id: uuid.UUID | None = None) -> int:
+    """清除查询结果缓存，不指定 ``sql_id`` 时清空全部，返回清除的条目数。"""
+    return _backend.invalidate(sql_id)
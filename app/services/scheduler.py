@@ -0,0 +1,206 @@
+import asyncio
+import heapq
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlmodel import col, or_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models.task_model import TaskRun, TaskStatus
+from app.services.crawler import CrawlWorker
+from app.services.cron import next_fire_time
+
+logger = logging.getLogger(__name__)
+
+Dispatcher = Callable[[TaskRun], Awaitable[None]]
+
+
+def as_utc(dt: datetime | None) -> datetime | None:
+    """数据库驱动可能返回 naive datetime，统一视为 UTC。"""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=UTC) if dt.tzinfo is None else dt
+
+
+class TaskScheduler:
+    """按 ``cron_expr`` 和 ``priority`` 调度 ``TaskRun``。
+
+    每个 TaskRun 的下次触发时间保存在带索引的 ``next_fire_at`` 列中，调度器每
+    ``sync_interval`` 秒只读取下一个周期内到期的行（以及租约已过期的执行中任务），
+    放入按 (next_fire, -priority) 排序的最小堆；到期时以
+    ``SELECT ... FOR UPDATE SKIP LOCKED`` 批量认领并置为 IN_PROGRESS，同时推算
+    CRON 任务的下一次触发时间，再交给 ``dispatch`` 执行。多个调度器副本同时运行时，
+    同一触发时刻的任务只会被认领一次。
+
+    执行中的任务由执行方定期刷新 ``heartbeat_at``；超过 ``lease`` 秒未刷新
+    （调度器或执行进程退出）的任务会被重新认领。没有 ``cron_expr`` 的任务只在状态
+    为 BEGIN 时执行一次。
+    """
+
+    def __init__(
+        self,
+        dispatch: Dispatcher,
+        sync_interval: float = settings.SCHEDULER_SYNC_INTERVAL,
+        batch_size: int = settings.SCHEDULER_BATCH_SIZE,
+        lease: float = settings.SCHEDULER_RUN_LEASE,
+    ) -> None:
+        self.dispatch = dispatch
+        self.sync_interval = sync_interval
+        self.batch_size = batch_size
+        self.lease = lease
+        # 堆中的条目可能已过时（重新同步后），以 _scheduled 中记录的触发时间为准
+        self._heap: list[tuple[datetime, int, uuid.UUID]] = []
+        self._scheduled: dict[uuid.UUID, datetime] = {}
+        self._running: set[asyncio.Task] = set()
+        self._stopping = asyncio.Event()
+
+    def due_condition(self, until: datetime) -> Any:
+        """在 ``until`` 之前到期的任务：已到触发时间的任务，或租约已过期的执行中任务。"""
+        return or_(
+            (col(TaskRun.next_fire_at) <= until)
+            & TaskRun.enabled
+            & col(TaskRun.status).not_in([TaskStatus.IN_PROGRESS.value, TaskStatus.KILL.value]),
+            (col(TaskRun.heartbeat_at) <= until - timedelta(seconds=self.lease))
+            & (col(TaskRun.status) == TaskStatus.IN_PROGRESS.value),
+        )
+
+    async def sync(self) -> None:
+        """从数据库读取下一个同步周期内到期的任务，重建调度堆。"""
+        horizon = datetime.now(UTC) + timedelta(seconds=self.sync_interval)
+        statement = select(
+            TaskRun.id, TaskRun.priority, TaskRun.status, TaskRun.next_fire_at, TaskRun.heartbeat_at
+        ).where(self.due_condition(horizon))
+        async with AsyncSession(async_engine) as session:
+            runs = (await session.exec(statement)).all()
+
+        self._heap, self._scheduled = [], {}
+        for run in runs:
+            if run.status == TaskStatus.IN_PROGRESS.value:
+                fire = as_utc(run.heartbeat_at) + timedelta(seconds=self.lease)  # type: ignore[operator]
+            else:
+                fire = as_utc(run.next_fire_at)
+            self._push(run.id, fire, run.priority)  # type: ignore[arg-type]
+        logger.debug("Scheduler synced %d due task runs", len(self._heap))
+
+    def _push(self, run_id: uuid.UUID, fire: datetime, priority: int) -> None:
+        heapq.heappush(self._heap, (fire, -priority, run_id))
+        self._scheduled[run_id] = fire
+
+    def _pop_due(self, now: datetime) -> list[uuid.UUID]:
+        due: list[uuid.UUID] = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            fire, _, run_id = heapq.heappop(self._heap)
+            if self._scheduled.get(run_id) == fire:
+                del self._scheduled[run_id]
+                due.append(run_id)
+        return due
+
+    def reschedule(self, run: TaskRun, now: datetime) -> bool:
+        """更新 ``next_fire_at``，返回本次是否应执行该任务。"""
+        if run.status == TaskStatus.IN_PROGRESS.value:
+            # 租约过期：执行进程已退出，重新执行
+            logger.warning("Task run %s lease expired, rescheduling", run.id)
+            return True
+        if not run.cron_expr:
+            run.next_fire_at = None
+            return run.status == TaskStatus.BEGIN.value
+        try:
+            # 从上次开始时间往后推算；错过的触发点只补执行一次
+            expected = next_fire_time(run.cron_expr, as_utc(run.started_at) or now)
+            if expected > now:
+                run.next_fire_at = expected
+                return False
+            run.next_fire_at = next_fire_time(run.cron_expr, now)
+        except ValueError as e:
+            logger.warning("Task run %s has an invalid cron expression: %s", run.id, e)
+            run.next_fire_at = None
+            run.error_reason = str(e)
+            return False
+        return True
+
+    async def claim(self, due: list[uuid.UUID]) -> list[TaskRun]:
+        """认领到期的任务；已被其他副本锁定或认领的任务会被跳过。"""
+        now = datetime.now(UTC)
+        statement = (
+            select(TaskRun).where(col(TaskRun.id).in_(due), self.due_condition(now)).with_for_update(skip_locked=True)
+        )
+        claimed: list[TaskRun] = []
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            runs = (await session.exec(statement)).all()
+            for run in runs:
+                if self.reschedule(run, now):
+                    run.status = TaskStatus.IN_PROGRESS.value
+                    run.started_at = now
+                    run.heartbeat_at = now
+                    run.error_reason = None
+                    claimed.append(run)
+                session.add(run)
+            await session.commit()
+        # 推算出的下一次触发时间直接入堆，不必等到下次同步
+        horizon = now + timedelta(seconds=self.sync_interval)
+        for run in runs:
+            next_fire_at = as_utc(run.next_fire_at)
+            if next_fire_at is not None and next_fire_at <= horizon:
+                self._push(run.id, next_fire_at, run.priority)
+        return claimed
+
+    def _spawn(self, run: TaskRun) -> None:
+        task = asyncio.create_task(self._dispatch(run))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _dispatch(self, run: TaskRun) -> None:
+        try:
+            await self.dispatch(run)
+        except Exception:
+            logger.exception("Dispatching task run %s failed", run.id)
+
+    async def run(self) -> None:
+        """调度主循环，直到调用 :meth:`stop`。"""
+        next_sync = 0.0
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() >= next_sync:
+                    await self.sync()
+                    next_sync = time.monotonic() + self.sync_interval
+
+                due = self._pop_due(datetime.now(UTC))
+                if due:
+                    for run in await self.claim(due):
+                        self._spawn(run)
+                    continue
+            except Exception:
+                logger.exception("Scheduler iteration failed")
+                next_sync = time.monotonic() + self.sync_interval
+
+            delay = next_sync - time.monotonic()
+            if self._heap:
+                delay = min(delay, (self._heap[0][0] - datetime.now(UTC)).total_seconds())
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=max(delay, 0.05))
+            except TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def serve() -> None:
+    async with CrawlWorker() as worker:
+        await TaskScheduler(dispatch=worker.execute).run()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Starting task scheduler")
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
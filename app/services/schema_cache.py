@@ -0,0 +1,49 @@
+from collections.abc import Hashable
+from datetime import datetime
+
+from sqlalchemy import Engine, MetaData, Table
+from sqlalchemy.exc import NoSuchTableError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# 键: (数据库连接 URL, 表名)  值: (配置版本, Table | None)
+_schema_cache = TTLCache(ttl=settings.DATA_SCHEMA_CACHE_TTL, maxsize=512)
+
+
+def _engine_key(engine: Engine) -> str:
+    return engine.url.render_as_string(hide_password=False)
+
+
+def get_table(engine: Engine, table_name: str, version: datetime | None = None) -> Table | None:
+    """返回反射得到的表结构，表不存在时返回 None。
+
+    结果按 (engine URL, table_name) 在进程内缓存；``version`` 一般传入
+    ``DataQueryConfig.updated_at``，版本变化时视为缓存失效并重新反射。
+    不传 ``version`` 时接受任意版本的缓存，不会使其他调用方的缓存失效。
+    """
+    key = (_engine_key(engine), table_name)
+    cached = _schema_cache.get(key)
+    if cached is not None and (version is None or cached[0] == version):
+        return cached[1]
+
+    try:
+        # autoload_with 会自动从数据库读取字段信息
+        table = Table(table_name, MetaData(), autoload_with=engine)
+    except NoSuchTableError:
+        table = None
+
+    # 不存在的表同样缓存，避免反复查询数据库目录
+    _schema_cache.set(key, (version, table))
+    return table
+
+
+def invalidate_table(table_name: str | None = None, engine: Engine | None = None) -> int:
+    """清除表结构缓存，可按表名和/或 engine 过滤，返回清除的条目数。"""
+    engine_key = _engine_key(engine) if engine is not None else None
+
+    def match(key: Hashable) -> bool:
+        url, name = key  # type: ignore[misc]
+        return (table_name is None or name == table_name) and (engine_key is None or url == engine_key)
+
+    return _schema_cache.invalidate(match)
@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+from sqlalchemy import Engine, Table, func, select, text
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CountType(Enum):
+    EXACT = "exact"  # 本次请求实时 COUNT(*)
+    CACHED = "cached"  # 缓存的精确值，可能略有滞后
+    ESTIMATE = "estimate"  # 数据库目录中的估算行数
+
+
+# 键: (数据库连接 URL, 表名)  值: (行数, 计算时间)
+# 条目保留时间长于刷新周期，过期的精确值在后台刷新期间仍可返回
+_count_cache = TTLCache(ttl=settings.DATA_COUNT_CACHE_TTL * 10, maxsize=1024)
+_refreshing: set[tuple[str, str]] = set()
+_refreshing_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=settings.DATA_COUNT_REFRESH_WORKERS, thread_name_prefix="table-count")
+
+
+def _cache_key(engine: Engine, table: Table) -> tuple[str, str]:
+    return engine.url.render_as_string(hide_password=False), table.name
+
+
+def exact_count(engine: Engine, table: Table) -> int:
+    """执行 SELECT count(*) 并刷新缓存。"""
+    with engine.connect() as connection:
+        count = connection.execute(select(func.count()).select_from(table)).scalar_one()
+    _count_cache.set(_cache_key(engine, table), (count, time.monotonic()))
+    return count
+
+
+def estimate_count(engine: Engine, table: Table) -> int | None:
+    """从数据库目录读取估算行数，不支持的方言或尚未统计时返回 None。"""
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        statement = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)")
+    elif dialect in ("mysql", "mariadb"):
+        statement = text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"
+        )
+    else:
+        return None
+
+    with engine.connect() as connection:
+        estimate = connection.execute(statement, {"table_name": table.name}).scalar()
+    # PostgreSQL 中从未 ANALYZE 过的表 reltuples 为 -1
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def _refresh(engine: Engine, table: Table, key: tuple[str, str]) -> None:
+    try:
+        exact_count(engine, table)
+    except Exception as e:
+        logger.warning("Refreshing row count of %s failed: %s", table.name, e)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(engine: Engine, table: Table) -> None:
+    key = _cache_key(engine, table)
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _executor.submit(_refresh, engine, table, key)
+
+
+def count_rows(engine: Engine, table: Table, exact: bool = False) -> tuple[int, CountType]:
+    """返回表的行数及其来源。
+
+    ``exact`` 为 True 时总是实时计数；否则优先返回缓存的精确值，缓存缺失或过期时
+    在后台重新计数，并先用数据库目录中的估算值应答。
+    """
+    if exact:
+        return exact_count(engine, table), CountType.EXACT
+
+    cached = _count_cache.get(_cache_key(engine, table))
+    if cached is not None:
+        count, computed_at = cached
+        if time.monotonic() - computed_at > settings.DATA_COUNT_CACHE_TTL:
+            _schedule_refresh(engine, table)
+        return count, CountType.CACHED
+
+    estimate = estimate_count(engine, table)
+    if estimate is None:
+        return exact_count(engine, table), CountType.EXACT
+
+    _schedule_refresh(engine, table)
+    return estimate, CountType.ESTIMATE
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Engine, Table
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+from app.core.config import settings
+from app.core.db import get_data_center_engine
+from app.services.schema_cache import get_table
+
+logger = logging.getLogger(__name__)
+
+
+def upsert_statement(dialect: str, table: Table, rows: list[dict[str, Any]], conflict_columns: Sequence[str]) -> Insert:
+    """生成多行 upsert 语句：MySQL 使用 ON DUPLICATE KEY UPDATE，PostgreSQL/SQLite 使用 ON CONFLICT。
+
+    ``rows`` 的字段必须一致；冲突时更新除 ``conflict_columns`` 外的所有字段，
+    没有 ``conflict_columns`` 时为普通的多行 INSERT。
+    """
+    columns = [c for c in rows[0] if c not in conflict_columns]
+    if dialect in ("mysql", "mariadb"):
+        statement = mysql.insert(table).values(rows)
+        if not conflict_columns:
+            return statement
+        if not columns:
+            return statement.prefix_with("IGNORE")
+        return statement.on_duplicate_key_update({c: statement.inserted[c] for c in columns})
+
+    module = postgresql if dialect == "postgresql" else sqlite
+    statement = module.insert(table).values(rows)
+    if not conflict_columns:
+        return statement
+    if not columns:
+        return statement.on_conflict_do_nothing(index_elements=list(conflict_columns))
+    return statement.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_={c: statement.excluded[c] for c in columns},
+    )
+
+
+class BatchWriter:
+    """把抓取结果缓冲后按批 upsert 到数据中心表。
+
+    缓冲达到 ``batch_size`` 条，或距上次写入超过 ``flush_interval`` 秒时写入一次，
+    每批是一条多行 INSERT，吞吐量由数据库决定而不是逐行提交。
+    同一批内冲突键相同的记录只保留最后一条。
+
+    ``conflict_columns`` 缺省为表的主键，PostgreSQL 要求这些列上有唯一约束。
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        db_uri: str | None = None,
+        conflict_columns: Sequence[str] | None = None,
+        batch_size: int = settings.CRAWL_WRITE_BATCH_SIZE,
+        flush_interval: float = settings.CRAWL_WRITE_FLUSH_INTERVAL,
+    ) -> None:
+        self.table_name = table_name
+        self.db_uri = db_uri
+        self.conflict_columns = list(conflict_columns or [])
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer: list[dict[str, Any]] = []
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._inflight: set[asyncio.Future] = set()
+        self._engine: Engine | None = None
+        self._table: Table | None = None
+
+    def _load_table(self) -> Table:
+        if self._table is None:
+            self._engine = get_data_center_engine(self.db_uri)
+            table = get_table(self._engine, self.table_name)
+            if table is None:
+                raise ValueError(f"数据表不存在: {self.table_name}")
+            if not self.conflict_columns:
+                self.conflict_columns = [c.name for c in table.primary_key.columns]
+            self._table = table
+        return self._table
+
+    async def __aenter__(self) -> "BatchWriter":
+        await asyncio.to_thread(self._load_table)
+        self._timer = asyncio.create_task(self._flush_periodically())
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def add(self, record: dict[str, Any]) -> None:
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # 记录保留在缓冲区，下次 flush 或 close 时重试并向调用方抛出异常
+                logger.exception("Periodic flush to %s failed", self.table_name)
+
+    async def flush(self) -> int:
+        """写入缓冲区中的全部记录，返回去重后写入的行数。
+
+        写入在线程中执行，无法中途取消：``flush`` 被取消时立即返回，已开始的这批
+        写入仍会在后台完成并提交（计入 :attr:`written`），这批记录不会放回缓冲区。
+        写入失败时事务已回滚，记录放回缓冲区等待重试。
+        """
+        async with self._lock:
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            write = asyncio.ensure_future(asyncio.to_thread(self._write, rows))
+            self._inflight.add(write)
+            write.add_done_callback(self._write_done)
+            try:
+                return await asyncio.shield(write)
+            except Exception:
+                self._buffer[:0] = rows
+                raise
+
+    def _write_done(self, write: asyncio.Future) -> None:
+        self._inflight.discard(write)
+        if not write.cancelled() and write.exception() is None:
+            self.written += write.result()
+
+    def _write(self, records: list[dict[str, Any]]) -> int:
+        table = self._load_table()
+        names = set(table.columns.keys())
+        key = self.conflict_columns
+
+        # 按冲突键去重，并按字段集合分组（多行 VALUES 要求每行字段一致）
+        keyed: dict[tuple, dict[str, Any]] = {}
+        unkeyed: list[dict[str, Any]] = []
+        for record in records:
+            row = {k: v for k, v in record.items() if k in names}
+            if key and all(c in row for c in key):
+                keyed[tuple(row[c] for c in key)] = row
+            else:
+                unkeyed.append(row)
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row in [*keyed.values(), *unkeyed]:
+            groups.setdefault(tuple(row), []).append(row)
+
+        assert self._engine is not None
+        dialect = self._engine.dialect.name
+        with self._engine.begin() as connection:
+            for rows in groups.values():
+                connection.execute(upsert_statement(dialect, table, rows, key))
+        return len(keyed) + len(unkeyed)
+
+    def abort(self) -> None:
+        """放弃缓冲区中尚未写入的记录（任务被停止时使用）。"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._buffer.clear()
+
+    async def close(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
@@ -1,5 +1,8 @@
+import base64
+import binascii
 import hashlib
 import json
+from datetime import datetime
 from typing import Any
 
 
@@ -53,3 +56,38 @@ class SecureUtil:
         result_cache.append(md5_hash.hexdigest())
 
         return md5_hash.hexdigest()[8:24] if short else md5_hash.hexdigest()
+
+
+class CursorUtil:
+    """提供键集 (keyset) 分页游标编解码的工具类。
+
+    游标是对 (publish_time, id) 的不透明编码，客户端只需原样回传。
+    """
+
+    @staticmethod
+    def encode(publish_time: datetime, record_id: int) -> str:
+        """将排序键编码为 URL 安全的游标字符串。
+
+        Args:
+            publish_time: 当前页最后一条记录的发布时间。
+            record_id: 当前页最后一条记录的 ID。
+
+        Returns:
+            URL 安全的 base64 字符串（去掉末尾的 ``=``）。
+        """
+        payload = json.dumps([publish_time.isoformat(), record_id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode(cursor: str) -> tuple[datetime, int]:
+        """解码由 :meth:`encode` 生成的游标。
+
+        Raises:
+            ValueError: 游标格式不合法。
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            publish_time, record_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+            return datetime.fromisoformat(publish_time), int(record_id)
+        except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e